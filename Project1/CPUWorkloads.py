@@ -8,16 +8,29 @@
 # Defining the problem
 # set initial conditions
 # defining a time range
-# solve the ODE
+# solve the ODE (closed form, odeint for nonlinear variants)
 # Compute the analytical solution
+# Stream time-varying rates from a trace
+# Couple machines through a sparse load-balancer network
 # Visualize and graph results
 # ============================
 # ============================
 # Imports
 # ============================
+import itertools
+import sys
+import time
+from contextlib import nullcontext as stage
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import odeint # numerical ODE solver
+from scipy import sparse
+from scipy.integrate import odeint, solve_ivp # numerical ODE solvers
+from scipy.sparse.linalg import spsolve
+
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
 
 # ============================
 # Define the ODE system
@@ -26,28 +39,265 @@ def cpu_util(u, t, lam, mu):
     return lam * (1 - u) - mu * u
 
 # ============================
-# Parameters
+# Analytical solution
 # ============================
-lam = 2.0 # job arrival rate
-mu = 1.0  # Job decay rate
-u0 = 0.2   # initial condition
-t = np.linspace(0, 10, 10000)  # time grid from 0 to 10
+# cpu_util is linear: du/dt = lam - (lam + mu) u, so
+# u(t) = u_ss + (u0 - u_ss) e^(-(lam + mu) t) with u_ss = lam/(lam + mu)
+def cpu_util_steady_state(lam, mu):
+    return np.asarray(lam) / (np.asarray(lam) + np.asarray(mu))
+
+def cpu_util_exact(lam, mu, u0, t):
+    # lam, mu and u0 may be arrays describing a fleet of machines; the result
+    # has their broadcast shape with the time axis last
+    lam, mu, u0 = (np.asarray(v, dtype=float)[..., None] for v in (lam, mu, u0))
+    u_ss = lam / (lam + mu)
+    return u_ss + (u0 - u_ss) * np.exp(-(lam + mu) * np.asarray(t, dtype=float))
+
+def time_to_threshold(lam, mu, u0, threshold=0.9):
+    # First time u(t) reaches threshold; inf if it never does, which is the
+    # case unless threshold lies between u0 and the steady state
+    lam, mu, u0 = (np.asarray(v, dtype=float) for v in (lam, mu, u0))
+    u_ss = lam / (lam + mu)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_cross = np.log((u0 - u_ss) / (threshold - u_ss)) / (lam + mu)
+    reached = (threshold - u0) * (u_ss - threshold) > 0
+    return np.where(u0 == threshold, 0.0, np.where(reached, t_cross, np.inf))
 
 # ============================
 # Solve ODE
 # ============================
-sol = odeint(cpu_util, u0, t, args=(lam, mu))
-u = sol[:, 0] # First derivative
+def solve_cpu_util(lam, mu, u0, t, rhs=cpu_util):
+    # The linear model uses the exact solution for the whole fleet at once;
+    # odeint is only needed for other (nonlinear) right-hand sides
+    if rhs is cpu_util:
+        return cpu_util_exact(lam, mu, u0, t)
+
+    lam, mu, u0 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (lam, mu, u0)))
+    u = np.empty(lam.shape + (len(t),))
+    for i in np.ndindex(lam.shape):
+        sol = odeint(rhs, u0[i], t, args=(lam[i], mu[i]))
+        u[i] = sol[:, 0] # First derivative
+    return u
+
+# ============================
+# Networked utilization
+# ============================
+# N machines behind a load balancer. W[i, j] is the rate at which machine j
+# spills its load to machine i, so machine j loses d_j = sum_i W[i, j] of
+# its utilization per unit time and
+#   du/dt = lam (1 - u) - mu u + W u - d u = lam - A u,
+#   A = diag(lam + mu + d) - W.
+# A is sparse with nnz(W) + N entries and is the (constant) Jacobian up to
+# sign, so every solve below costs O(nnz) rather than O(N^2).
+def neighbour_routing(n, rate, hops=1):
+    # Ring topology: each machine spills to the `hops` machines on either
+    # side of it, at `rate` per neighbour
+    offsets = [k for k in range(-hops, hops + 1) if k != 0 and abs(k) < n]
+    if not offsets:
+        return sparse.csr_matrix((n, n))
+    rows = np.concatenate([(np.arange(n) + k) % n for k in offsets])
+    cols = np.tile(np.arange(n), len(offsets))
+    W = sparse.csr_matrix((np.full(len(rows), float(rate)), (rows, cols)), shape=(n, n))
+    W.sum_duplicates()  # small rings reach the same neighbour both ways
+    return W
+
+def cpu_util_network_matrix(lam, mu, W):
+    # A = diag(lam + mu + d) - W in CSC form (what the sparse LU wants)
+    W = sparse.csr_matrix(W, dtype=float)
+    n = W.shape[0]
+    outflow = np.asarray(W.sum(axis=0)).ravel()
+    diag = np.broadcast_to(np.asarray(lam, dtype=float), (n,)) \
+        + np.broadcast_to(np.asarray(mu, dtype=float), (n,)) + outflow
+    return (sparse.diags(diag) - W).tocsc()
+
+def cpu_util_network(t, u, lam, A):
+    # Right-hand side in solve_ivp form; A comes from cpu_util_network_matrix
+    return lam - A @ u
+
+def cpu_util_network_steady_state(lam, mu, W):
+    # Solves A u = lam with a sparse LU; with W = 0 this is lam/(lam + mu).
+    # A is column diagonally dominant whenever lam + mu > 0, so the solve is
+    # well posed and u >= 0
+    n = W.shape[0]
+    A = cpu_util_network_matrix(lam, mu, W)
+    return spsolve(A, np.broadcast_to(np.asarray(lam, dtype=float), (n,)).copy())
+
+def solve_cpu_util_network(lam, mu, W, u0, t, method="BDF", rtol=1e-6, atol=1e-9):
+    # Integrate the network with an implicit solver given the sparse
+    # Jacobian -A. Returns an (N, len(t)) array and solve_ivp's result
+    n = W.shape[0]
+    A = cpu_util_network_matrix(lam, mu, W)
+    lam = np.broadcast_to(np.asarray(lam, dtype=float), (n,)).copy()
+    u0 = np.broadcast_to(np.asarray(u0, dtype=float), (n,)).copy()
+    jac = (-A).tocsc()
+    sol = solve_ivp(cpu_util_network, (t[0], t[-1]), u0, method=method,
+                    t_eval=t, args=(lam, A), jac=jac, rtol=rtol, atol=atol)
+    if not sol.success:
+        raise RuntimeError(sol.message)
+    count("rhs_evals", sol.nfev)
+    count("lu_decompositions", sol.nlu)
+    return sol.y, sol
+
+# ============================
+# Trace-driven utilization
+# ============================
+def read_trace(path, chunk_size=65536, skiprows=0, bin_columns=1):
+    # Yield (n, k) blocks of a trace with one row per sample: column 0 is
+    # lam(t) and an optional column 1 is mu(t). .npy files and raw float64
+    # .bin files are memory mapped; anything else is read as CSV text, so
+    # only one block is ever in memory. A .bin file has no header, so
+    # bin_columns gives its layout: 1 for lam only (mu is then the constant
+    # mu of integrate_trace) or 2 for interleaved lam, mu pairs.
+    if path.endswith(".npy") or path.endswith(".bin"):
+        if path.endswith(".npy"):
+            data = np.load(path, mmap_mode="r")
+        else:
+            if bin_columns not in (1, 2):
+                raise ValueError("bin_columns must be 1 (lam) or 2 (lam, mu)")
+            data = np.memmap(path, dtype=np.float64, mode="r")
+            if len(data) % bin_columns:
+                raise ValueError(f"{path} does not hold whole rows of {bin_columns} values")
+            data = data.reshape(-1, bin_columns)
+        if data.ndim == 1:
+            data = data[:, None]
+        for start in range(0, len(data), chunk_size):
+            yield np.asarray(data[start:start + chunk_size], dtype=float)
+        return
+
+    with open(path) as f:
+        for _ in range(skiprows):
+            next(f, None)
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", ndmin=2)
+
+def _linear_scan(log_a, b, u_start, block=32):
+    # Solve u[n+1] = a[n] u[n] + b[n] for a whole chunk, given log(a) so
+    # that very fast decays stay finite. Inside each block of
+    # 32 samples the recurrence is unrolled as a lower-triangular product
+    # with decay factors exp(L_j - L_i) <= 1, so nothing can overflow; only
+    # the block start values are carried in a Python loop.
+    n = len(log_a)
+    pad = -n % block
+    log_a = np.concatenate([log_a, np.zeros(pad)]).reshape(-1, block)
+    b = np.concatenate([b, np.zeros(pad)]).reshape(-1, block)
+
+    L = np.cumsum(log_a, axis=1)
+    decay = np.tril(np.exp(np.minimum(L[:, :, None] - L[:, None, :], 0.0)))
+    forced = np.einsum("kji,ki->kj", decay, b)  # response from u = 0 at block start
+    growth = np.exp(L)                          # response to the block start value
+
+    starts = np.empty(len(b))
+    for k in range(len(b)):
+        starts[k] = u_start
+        u_start = growth[k, -1] * u_start + forced[k, -1]
+
+    u = growth * starts[:, None] + forced
+    return u.ravel()[:n]
+
+def integrate_trace(chunks, u0, dt=1.0, mu=1.0):
+    # Integrate cpu_util across a stream of trace blocks, treating the rates
+    # as constant over each sample. Every sample uses the exact solution, the
+    # state is carried across block boundaries, and the utilization at the
+    # end of each sample is yielded block by block.
+    u = float(u0)
+    for chunk in chunks:
+        lam_t = chunk[:, 0]
+        mu_t = chunk[:, 1] if chunk.shape[1] > 1 else np.full(len(chunk), float(mu))
+        rate = lam_t + mu_t
+        with np.errstate(invalid="ignore", divide="ignore"):
+            u_ss = np.where(rate > 0, lam_t / rate, 0.0)
+        u_chunk = _linear_scan(-rate * dt, -u_ss * np.expm1(-rate * dt), u)
+        u = u_chunk[-1]
+        yield u_chunk
+
+def run_trace(path, u0, dt=1.0, mu=1.0, out_path=None, chunk_size=65536, bin_columns=1):
+    # Stream a trace file through integrate_trace. Utilization is appended to
+    # out_path as raw float64 (readable with np.memmap) if given. bin_columns
+    # is the layout of a raw .bin trace (see read_trace). Returns the run
+    # statistics including trace-seconds per wall-second.
+    start = time.perf_counter()
+    samples = 0
+    u_final = float(u0)
+    out = open(out_path, "wb") if out_path is not None else None
+    try:
+        for u_chunk in integrate_trace(read_trace(path, chunk_size, bin_columns=bin_columns), u0, dt, mu):
+            samples += len(u_chunk)
+            count("samples", len(u_chunk))
+            count("chunks")
+            u_final = u_chunk[-1]
+            if out is not None:
+                out.write(u_chunk.data)
+    finally:
+        if out is not None:
+            out.close()
+    wall = time.perf_counter() - start
+    return {
+        "samples": samples,
+        "trace_seconds": samples * dt,
+        "wall_seconds": wall,
+        "trace_seconds_per_wall_second": samples * dt / wall if wall > 0 else float("inf"),
+        "final_utilization": u_final,
+    }
 
 # ============================
 # Create Graph
 # ============================
-plt.figure(figsize=(8,5))
-plt.plot(t, u, label="CPU Utilization", linewidth=2)
-plt.axhline(y=lam/(lam+mu),linestyle="--", label="Steady-State Utilization")  # the line at which the cpu will stabalize
-plt.xlabel("Time (s)")
-plt.ylabel("CPU Utilization (fraction)")
-plt.title("CPU Utilization Dynamics in a Computer System")
-plt.legend()
-plt.grid(True, linestyle="--", alpha=0.6)
-plt.show()
+def plot_cpu_util(t, u, lam, mu):
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    plt.figure(figsize=(8,5))
+    plt.plot(t, u, label="CPU Utilization", linewidth=2)
+    plt.axhline(y=cpu_util_steady_state(lam, mu),linestyle="--", label="Steady-State Utilization")  # the line at which the cpu will stabalize
+    plt.xlabel("Time (s)")
+    plt.ylabel("CPU Utilization (fraction)")
+    plt.title("CPU Utilization Dynamics in a Computer System")
+    plt.legend()
+    plt.grid(True, linestyle="--", alpha=0.6)
+    plt.show()
+
+def main():
+    # ============================
+    # Parameters
+    # ============================
+    lam = 2.0 # job arrival rate
+    mu = 1.0  # Job decay rate
+    u0 = 0.2   # initial condition
+    t = np.linspace(0, 10, 10000)  # time grid from 0 to 10
+
+    with stage("solve"):
+        u = solve_cpu_util(lam, mu, u0, t)
+
+    # ============================
+    # Networked cluster
+    # ============================
+    # 10^4 machines on a ring, every tenth one twice as busy, each spilling
+    # load to two neighbours on either side
+    n = 10000
+    lam_net = np.where(np.arange(n) % 10 == 0, 2 * lam, lam)
+    W = neighbour_routing(n, rate=0.5, hops=2)
+    with stage("network_steady_state"):
+        u_net = cpu_util_network_steady_state(lam_net, mu, W)
+    print(f"Network of {n} machines, steady-state utilization: "
+          f"{u_net.min():.4f} to {u_net.max():.4f} "
+          f"(isolated: {cpu_util_steady_state(lam, mu):.4f} and "
+          f"{cpu_util_steady_state(2 * lam, mu):.4f})")
+
+    with stage("plot"):
+        plot_cpu_util(t, u, lam, mu)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Trace mode: python3 CPUWorkloads.py trace.csv [dt] [output.bin|-] [bin_columns]
+        dt = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+        out_path = sys.argv[3] if len(sys.argv) > 3 and sys.argv[3] != "-" else None
+        bin_columns = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+        with stage("trace"):
+            stats = run_trace(sys.argv[1], u0=0.2, dt=dt, out_path=out_path,
+                              bin_columns=bin_columns)
+        for name, value in stats.items():
+            print(f"{name}: {value}")
+    else:
+        main()
@@ -2,22 +2,36 @@
 # Reece Gerhart & Mason Lohnes
 # ----------------------------
 # Imports:
-# Numpy Matplotlib SciPy Math
+# Numpy Matplotlib SciPy
 # ----------------------------
 # Approach to implementation:
 # Create an algorithm for RK
+# Create an adaptive Dormand-Prince RK
 # Define the equation
 # Run the RK solver
+# Batch many RK runs in lock-step
 # Run the ODEint solver
 # Create graph plots
 # Calculate the error
+# Run scenario files in batch across a process pool
 # ============================
 
-import math
+import csv
+import os
+import sys
+import time
+import warnings
+from contextlib import nullcontext as stage
+from multiprocessing import Pool
+
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.integrate import odeint
 
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
+
 def RK(x, y, h):
     k1 = equation(x, y)
     k2 = equation(x + h/2, y + (h/2)*k1)
@@ -27,72 +41,384 @@ def RK(x, y, h):
     return y + h * T4
 
 def equation(x, y):
-    return y/((math.exp(x))-1)
+    # expm1 keeps e^x - 1 accurate near x = 0 and works on arrays
+    return y/np.expm1(x)
 
 def ode_equation(y, x):
-    return y/((math.exp(x))-1)
-
-print("Runge-Kutta vs ODEint Comparison for dy/dx = y/(e^x - 1)")
-x0 = float(input("Input x0: "))
-y0 = float(input("Input y0: "))
-h = float(input("Input h: "))
-runs = int(input("Input number of runs: "))
-
-# Runge-Kutta solution
-x_rk = [x0]
-y_rk = [y0]
-x_current = x0
-y_current = y0
-
-for step in range(runs):
-    y_current = RK(x_current, y_current, h)
-    x_current = x_current + h
-    x_rk.append(x_current)
-    y_rk.append(y_current)
-    print("Step " + str(step + 1) + ": (" + str(round(x_current,4)) + "," + str(round(y_current,4)) + ")")
-
-# ODEint solution
-x_ode = np.linspace(x0, x0 + runs*h, runs*10 + 1)  # More points for smoother curve
-y_ode = odeint(ode_equation, y0, x_ode)
-
-# Plot Runge-Kutta solution alone
-plt.figure(figsize=(10, 6))
-plt.plot(x_rk, y_rk, 'ro-', label='Runge-Kutta (RK4)', markersize=6, linewidth=2)
-plt.xlabel('x', fontsize=12)
-plt.ylabel('y', fontsize=12)
-plt.title('Runge-Kutta (RK4) Solution', fontsize=14)
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.show()
-
-# Plot ODEint solution alone
-plt.figure(figsize=(10, 6))
-plt.plot(x_ode, y_ode, 'b-', label='ODEint (scipy)', linewidth=2)
-plt.xlabel('x', fontsize=12)
-plt.ylabel('y', fontsize=12)
-plt.title('ODEint Solution', fontsize=14)
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.show()
-
-# Plot comparison
-plt.figure(figsize=(12, 8))
-plt.plot(x_rk, y_rk, 'ro-', label='Runge-Kutta (RK4)', markersize=6, linewidth=2)
-plt.plot(x_ode, y_ode, 'b-', label='ODEint (scipy)', linewidth=2, alpha=0.7)
-plt.xlabel('x', fontsize=12)
-plt.ylabel('y', fontsize=12)
-plt.title('Comparison: Runge-Kutta vs ODEint\ndy/dx = y/(e^x - 1)', fontsize=14)
-plt.legend(fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.show()
-
-# Compute error
-x_rk_array = np.array(x_rk)
-y_rk_array = np.array(y_rk)
-y_ode_interp = np.interp(x_rk_array, x_ode, y_ode.flatten())
-errors = np.abs(y_rk_array - y_ode_interp)
-print(f"\nMaximum absolute error: {max(errors):.6f}")
-print(f"Average absolute error: {np.mean(errors):.6f}")
+    return y/np.expm1(x)
+
+def RK_batch(x0, y0, h, runs):
+    """
+    Advance N independent initial-value problems with RK4 in lock-step.
+
+    x0, y0 and h are broadcast against each other, so any of them may be an
+    array of N configurations; every step of the loop advances all N rows.
+
+    Returns:
+    - x: (N, runs+1) matrix of x values
+    - y: (N, runs+1) matrix of RK4 solution values
+    """
+    x0, y0, h = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)),
+                                    np.asarray(y0, dtype=float),
+                                    np.asarray(h, dtype=float))
+    x = np.empty((x0.size, runs + 1))
+    y = np.empty((x0.size, runs + 1))
+    x[:, 0] = x0
+    y[:, 0] = y0
+    for step in range(runs):
+        y[:, step + 1] = RK(x[:, step], y[:, step], h)
+        x[:, step + 1] = x[:, step] + h
+    count("steps", runs * x0.size)
+    count("rhs_evals", 4 * runs * x0.size)
+    return x, y
+
+def odeint_batch(x0, y0, h, runs):
+    """
+    ODEint reference solution at the RK nodes x0 + n*h for N problems.
+
+    Every row is integrated by its own odeint call, so its step sizes and
+    error control depend only on that row, never on the rest of the batch.
+    The tolerances are far tighter than RK4's error so the rows can serve
+    as a reference.
+
+    Returns:
+    - (N, runs+1) matrix of reference solution values
+    - List of N odeint status messages ("Integration successful." for rows
+      that were solved)
+    """
+    x0, y0, h = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)),
+                                    np.asarray(y0, dtype=float),
+                                    np.asarray(h, dtype=float))
+    y = np.empty((x0.size, runs + 1))
+    messages = []
+    steps = np.arange(runs + 1)
+    for i in range(x0.size):
+        y_row, info = odeint(ode_equation, y0[i], x0[i] + steps*h[i],
+                             rtol=1e-10, atol=1e-12, full_output=True)
+        y[i] = y_row[:, 0]
+        messages.append(info["message"])
+        count("steps", int(info["nst"][-1]))
+        count("rhs_evals", int(info["nfe"][-1]))
+    return y, messages
+
+def RK_batch_errors(x0, y0, h, runs):
+    """
+    Compare batched RK4 against the ODEint reference row by row.
+
+    Returns:
+    - max_errors: Maximum absolute error of each row
+    - mean_errors: Average absolute error of each row
+    - messages: odeint status of each row's reference solution
+    """
+    _, y_rk = RK_batch(x0, y0, h, runs)
+    y_ref, messages = odeint_batch(x0, y0, h, runs)
+    errors = np.abs(y_rk - y_ref)
+    return errors.max(axis=1), errors.mean(axis=1), messages
+
+# Dormand-Prince 5(4) tableau
+DP_C = [0, 1/5, 3/10, 4/5, 8/9, 1, 1]
+DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+DP_B = [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0]
+DP_E = [71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40]
+
+def adaptive_RK(f, x0, y0, x_end, rtol=1e-8, atol=1e-10, h=None, max_steps=100000):
+    """
+    Solve dy/dx = f(x, y) from x0 to x_end with an adaptive Dormand-Prince
+    5(4) Runge-Kutta pair.
+
+    The embedded 4th order solution gives an error estimate for every step,
+    which is used to accept or reject the step and choose the next h so each
+    step stays within atol + rtol*|y|. y0 may be a scalar or a vector.
+
+    Returns:
+    - x: Array of accepted x values
+    - y: Array of solution values (one row per x for vector problems)
+    - stats: Dict with accepted steps, rejected steps and RHS evaluations
+    """
+    scalar = np.ndim(y0) == 0
+    y = np.atleast_1d(np.asarray(y0, dtype=float))
+    x = float(x0)
+    direction = 1.0 if x_end >= x0 else -1.0
+    span = abs(x_end - x0)
+
+    def rms(v):
+        return np.sqrt(np.mean(v * v))
+
+    k = [np.asarray(f(x, y), dtype=float)] + [None] * 6
+    nfev = 1
+
+    # Initial step size from the size of y and its derivative
+    if h is None:
+        scale = atol + rtol * np.abs(y)
+        d0 = rms(y / scale)
+        d1 = rms(k[0] / scale)
+        h = 0.01 * d0 / d1 if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+    h = min(abs(h), span) if span > 0 else 0.0
+
+    xs = [x]
+    ys = [y.copy()]
+    steps = 0
+    rejected = 0
+
+    while direction * (x_end - x) > 1e-12 * max(1.0, abs(x_end)):
+        if steps + rejected >= max_steps:
+            raise RuntimeError("adaptive_RK exceeded max_steps")
+        h = min(h, abs(x_end - x))
+        hs = direction * h
+
+        for i in range(1, 7):
+            dy = sum(a * kj for a, kj in zip(DP_A[i], k) if a != 0)
+            k[i] = np.asarray(f(x + DP_C[i]*hs, y + hs*dy), dtype=float)
+        nfev += 6
+
+        y_new = y + hs * sum(b * ki for b, ki in zip(DP_B, k) if b != 0)
+        err = hs * sum(e * ki for e, ki in zip(DP_E, k) if e != 0)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err_norm = rms(err / scale)
+
+        if err_norm <= 1.0:
+            # Accept the step; k7 is f at the new point (first same as last)
+            x = x + hs
+            y = y_new
+            k[0] = k[6]
+            xs.append(x)
+            ys.append(y.copy())
+            steps += 1
+            factor = 5.0 if err_norm == 0 else min(5.0, 0.9 * err_norm ** -0.2)
+        else:
+            rejected += 1
+            factor = max(0.2, 0.9 * err_norm ** -0.2)
+        h = h * factor
+
+    y_out = np.array(ys)
+    if scalar:
+        y_out = y_out[:, 0]
+    stats = {"steps": steps, "rejected": rejected, "nfev": nfev}
+    count("steps", steps)
+    count("rejected_steps", rejected)
+    count("rhs_evals", nfev)
+    return np.array(xs), y_out, stats
+
+def solve_RK(x0, y0, h, runs, verbose=True):
+    """Step the RK4 solver from (x0, y0) and return the lists of x and y."""
+    x_rk = [x0]
+    y_rk = [y0]
+    x_current = x0
+    y_current = y0
+
+    for step in range(runs):
+        y_current = RK(x_current, y_current, h)
+        x_current = x_current + h
+        x_rk.append(x_current)
+        y_rk.append(y_current)
+        if verbose:
+            print("Step " + str(step + 1) + ": (" + str(round(x_current,4)) + "," + str(round(y_current,4)) + ")")
+    count("steps", runs)
+    count("rhs_evals", 4 * runs)
+    return x_rk, y_rk
+
+def solve_odeint(x0, y0, h, runs):
+    """ODEint solution on a grid 10x finer than the RK steps."""
+    x_ode = np.linspace(x0, x0 + runs*h, runs*10 + 1)  # More points for smoother curve
+    y_ode, info = odeint(ode_equation, y0, x_ode, full_output=True)
+    count("steps", int(info["nst"][-1]))
+    count("rhs_evals", int(info["nfe"][-1]))
+    return x_ode, y_ode
+
+def compute_errors(x_rk, y_rk, x_ode, y_ode):
+    """Absolute error of the RK points against the interpolated ODEint curve."""
+    x_rk_array = np.array(x_rk)
+    y_rk_array = np.array(y_rk)
+    y_ode_interp = np.interp(x_rk_array, x_ode, y_ode.flatten())
+    return np.abs(y_rk_array - y_ode_interp)
+
+def plot_solutions(x_rk, y_rk, x_ode, y_ode):
+    """Show the RK, ODEint and comparison figures."""
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    # Plot Runge-Kutta solution alone
+    plt.figure(figsize=(10, 6))
+    plt.plot(x_rk, y_rk, 'ro-', label='Runge-Kutta (RK4)', markersize=6, linewidth=2)
+    plt.xlabel('x', fontsize=12)
+    plt.ylabel('y', fontsize=12)
+    plt.title('Runge-Kutta (RK4) Solution', fontsize=14)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+
+    # Plot ODEint solution alone
+    plt.figure(figsize=(10, 6))
+    plt.plot(x_ode, y_ode, 'b-', label='ODEint (scipy)', linewidth=2)
+    plt.xlabel('x', fontsize=12)
+    plt.ylabel('y', fontsize=12)
+    plt.title('ODEint Solution', fontsize=14)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+
+    # Plot comparison
+    plt.figure(figsize=(12, 8))
+    plt.plot(x_rk, y_rk, 'ro-', label='Runge-Kutta (RK4)', markersize=6, linewidth=2)
+    plt.plot(x_ode, y_ode, 'b-', label='ODEint (scipy)', linewidth=2, alpha=0.7)
+    plt.xlabel('x', fontsize=12)
+    plt.ylabel('y', fontsize=12)
+    plt.title('Comparison: Runge-Kutta vs ODEint\ndy/dx = y/(e^x - 1)', fontsize=14)
+    plt.legend(fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
+
+SCENARIO_FIELDS = ("x0", "y0", "h", "runs")
+
+def run_scenario(scenario):
+    """
+    Run the RK4 vs ODEint comparison of main() for one parameter set,
+    without printing or plotting. Floating-point and solver warnings are
+    silenced; a scenario whose errors are not finite counts as failed.
+
+    Returns:
+    - The scenario's fields plus max_error, mean_error, rk_seconds,
+      odeint_seconds and error (empty unless the scenario failed)
+    """
+    row = dict(scenario)
+    try:
+        x0, y0, h = (float(scenario[name]) for name in ("x0", "y0", "h"))
+        runs = int(scenario["runs"])
+        with warnings.catch_warnings(), np.errstate(all="ignore"):
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            x_rk, y_rk = solve_RK(x0, y0, h, runs, verbose=False)
+            rk_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            x_ode, y_ode = solve_odeint(x0, y0, h, runs)
+            odeint_seconds = time.perf_counter() - start
+            errors = compute_errors(x_rk, y_rk, x_ode, y_ode)
+        if not np.all(np.isfinite(errors)):
+            raise FloatingPointError("solution is not finite (the equation diverges)")
+        row.update(max_error=float(np.max(errors)), mean_error=float(np.mean(errors)),
+                   rk_seconds=rk_seconds, odeint_seconds=odeint_seconds, error="")
+    except Exception as exc:  # one bad row should not stop the batch
+        row.update(max_error=None, mean_error=None, rk_seconds=None,
+                   odeint_seconds=None, error=f"{type(exc).__name__}: {exc}")
+    return row
+
+def read_scenarios(path):
+    """Read a CSV scenario file with columns x0, y0, h, runs (extra columns
+    such as a name are carried through to the results)."""
+    with open(path, newline="") as f:
+        scenarios = list(csv.DictReader(f))
+    if scenarios:
+        missing = [name for name in SCENARIO_FIELDS if name not in scenarios[0]]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    return scenarios
+
+def _import_pandas():
+    """pandas is optional and only needed for Parquet output."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise RuntimeError("Parquet output needs pandas (and pyarrow); use a .csv path") from None
+    return pd
+
+def write_results(rows, path):
+    """Write result rows as CSV, or as Parquet (needs pandas) if path ends in .parquet."""
+    fields = list(dict.fromkeys(name for row in rows for name in row))
+    if path.endswith(".parquet"):
+        _import_pandas().DataFrame(rows, columns=fields).to_parquet(path, index=False)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def run_batch(scenario_path, output_path, processes=None):
+    """
+    Run every scenario of a file across a process pool and write one
+    result row per scenario, in the order of the file.
+
+    Returns:
+    - The list of result rows
+    """
+    if output_path.endswith(".parquet"):
+        _import_pandas()  # fail before the runs rather than after
+    scenarios = read_scenarios(scenario_path)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(scenarios)))
+    with stage("batch"):
+        if processes == 1:
+            rows = [run_scenario(s) for s in scenarios]
+        else:
+            with Pool(processes) as pool:
+                rows = pool.map(run_scenario, scenarios,
+                                chunksize=max(1, len(scenarios) // (4 * processes)))
+        count("scenarios", len(rows))
+    write_results(rows, output_path)
+    return rows
+
+def main():
+    print("Runge-Kutta vs ODEint Comparison for dy/dx = y/(e^x - 1)")
+    x0 = float(input("Input x0: "))
+    y0 = float(input("Input y0: "))
+    h = float(input("Input h: "))
+    runs = int(input("Input number of runs: "))
+
+    # Runge-Kutta solution
+    with stage("rk4"):
+        x_rk, y_rk = solve_RK(x0, y0, h, runs)
+
+    # ODEint solution
+    with stage("odeint"):
+        x_ode, y_ode = solve_odeint(x0, y0, h, runs)
+
+    with stage("plot"):
+        plot_solutions(x_rk, y_rk, x_ode, y_ode)
+
+    # Compute error
+    with stage("error_interp"):
+        errors = compute_errors(x_rk, y_rk, x_ode, y_ode)
+    print(f"\nMaximum absolute error: {max(errors):.6f}")
+    print(f"Average absolute error: {np.mean(errors):.6f}")
+
+    # Adaptive Dormand-Prince solution over the same interval
+    with stage("adaptive_rk"):
+        x_ad, y_ad, ad_stats = adaptive_RK(equation, x0, y0, x0 + runs*h)
+    with stage("adaptive_reference"):
+        ad_ref = odeint(ode_equation, y0, x_ad).flatten()
+    ad_errors = np.abs(y_ad - ad_ref)
+    print("\nAdaptive Dormand-Prince RK45:")
+    print(f"Accepted steps: {ad_stats['steps']}, rejected steps: {ad_stats['rejected']}")
+    print(f"RHS evaluations: {ad_stats['nfev']} (fixed-h RK4: {4*runs})")
+    print(f"Maximum absolute error vs ODEint: {max(ad_errors):.6e}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        # Batch mode: python3 solution.py --batch scenarios.csv [results.csv|results.parquet] [processes]
+        if len(sys.argv) < 3:
+            sys.exit("usage: python3 solution.py --batch scenarios.csv [results.csv|results.parquet] [processes]")
+        output = sys.argv[3] if len(sys.argv) > 3 else "results.csv"
+        try:
+            processes = None
+            if len(sys.argv) > 4:
+                if not sys.argv[4].isdigit() or int(sys.argv[4]) < 1:
+                    raise ValueError(f"processes must be a positive integer, got {sys.argv[4]!r}")
+                processes = int(sys.argv[4])
+            rows = run_batch(sys.argv[2], output, processes)
+        except (OSError, RuntimeError, ValueError) as exc:
+            sys.exit(f"error: {exc}")
+        failed = sum(1 for row in rows if row["error"])
+        print(f"{len(rows)} scenarios written to {output} ({failed} failed)")
+        sys.exit(1 if failed else 0)
+    else:
+        main()
@@ -2,21 +2,35 @@
 # Reece Gerhart Mason Lohnes
 # ----------------------------
 # Imports:
-# Numpy    Matplotlib
+# Numpy    Matplotlib    SciPy
 # ----------------------------
 # Approach to implementation:
 # Create Lorenz Function
 # Create a Simulator Function
+# Implicit solvers with the analytic Jacobian for large r
 # Take Inputs For R
 # Output Graphs
+# Sweep r in parallel for a bifurcation diagram
+# Stream long runs to a memory-mapped .npy file
+# Store trajectories compactly (any dtype, or a ring buffer of the last K)
 # ============================
 
 # ============================
 # Imports
 # ============================
+import os
+from contextlib import nullcontext as stage
+from multiprocessing import Pool, shared_memory
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D  # Required for 3D projection
+from scipy.integrate import BDF, Radau
+from scipy.sparse import bsr_matrix
+
+
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
 
 
 def lorenz(x, y, z, s=10, r=28, b=2.667):
@@ -36,21 +50,90 @@ def lorenz(x, y, z, s=10, r=28, b=2.667):
     return x_dot, y_dot, z_dot
 
 
-def simulate_and_plot(r_value):
+def lorenz_ensemble(states, s=10, r=28, b=2.667):
     """
-    Simulate the Lorenz system and plot the results.
+    Calculate the Lorenz derivatives for a whole ensemble of points.
     
-    Creates a 4-panel visualization showing:
-    - 3D trajectory of the Lorenz attractor
-    - Time series plots for x(t), y(t), and z(t)
+    Given:
+       states: (M, 3) array of points (x, y, z), one row per member
+       s, r, b: scalars or length-M arrays of Lorenz parameters
+    Returns:
+       (M, 3) array of the derivatives at every point
+    """
+    derivs = np.empty_like(states)
+    derivs[:, 0], derivs[:, 1], derivs[:, 2] = lorenz(
+        states[:, 0], states[:, 1], states[:, 2], s=s, r=r, b=b)
+    return derivs
+
+
+def simulate_ensemble(r_values, initial_states, s_values=10, b_values=2.667,
+                      dt=0.01, num_steps=10000, dtype=np.float64, keep_last=None):
+    """
+    Simulate many Lorenz systems in lock-step.
+    
+    Every member uses the same Euler update as simulate_and_plot, but the
+    whole ensemble is advanced in a single vectorized step per time step,
+    so the Python loop runs num_steps times regardless of ensemble size.
     
     Args:
-        r_value: The r parameter value for the Lorenz system
+        r_values: r parameter per member (scalar or length M)
+        initial_states: (3,) or (M, 3) array of starting points
+        s_values: s parameter per member (scalar or length M)
+        b_values: b parameter per member (scalar or length M)
+        dt: Time step size
+        num_steps: Number of simulation steps
+        dtype: Storage dtype; the integration itself stays in float64
+        keep_last: Keep only the last keep_last states in a ring buffer
+        
+    Returns:
+        (num_steps + 1, M, 3) array holding every member's trajectory
+        (keep_last rows instead when keep_last is given)
     """
-    # Simulation parameters
-    dt = 0.01          # Time step size
-    num_steps = 10000  # Number of simulation steps
+    initial_states = np.asarray(initial_states, dtype=float)
+    shape = np.broadcast_shapes(initial_states.shape[:-1], np.shape(r_values),
+                                np.shape(s_values), np.shape(b_values))
+    if len(shape) > 1:
+        raise ValueError("ensemble parameters must be scalars or 1-D arrays")
+    M = shape[0] if shape else 1
+
+    r = np.broadcast_to(np.asarray(r_values, dtype=float), (M,))
+    s = np.broadcast_to(np.asarray(s_values, dtype=float), (M,))
+    b = np.broadcast_to(np.asarray(b_values, dtype=float), (M,))
 
+    # One contiguous block: trajectory[i % rows] is the (M, 3) state at
+    # step i, so with keep_last it wraps around as a ring buffer
+    rows = num_steps + 1 if keep_last is None else max(1, min(keep_last, num_steps + 1))
+    trajectory = np.empty((rows, M, 3), dtype=dtype)
+    state = np.empty((M, 3))
+    state[:] = initial_states
+    trajectory[0] = state
+
+    # Integrate every member at once using Euler's method
+    for i in range(num_steps):
+        derivs = lorenz_ensemble(state, s=s, r=r, b=b)
+        np.multiply(derivs, dt, out=derivs)
+        np.add(state, derivs, out=state)
+        trajectory[(i + 1) % rows] = state
+
+    # Oldest retained state first
+    start = (num_steps + 1) % rows
+    if start:
+        trajectory = np.concatenate((trajectory[start:], trajectory[:start]))
+    return trajectory
+
+
+def simulate(r_value, dt=0.01, num_steps=10000):
+    """
+    Simulate the Lorenz system with Euler's method.
+    
+    Args:
+        r_value: The r parameter value for the Lorenz system
+        dt: Time step size
+        num_steps: Number of simulation steps
+        
+    Returns:
+        xs, ys, zs: Arrays of trajectory data (num_steps + 1 points each)
+    """
     # Allocate arrays for storing trajectory data
     xs = np.empty(num_steps + 1)
     ys = np.empty(num_steps + 1)
@@ -69,8 +152,418 @@ def simulate_and_plot(r_value):
         ys[i + 1] = ys[i] + y_dot * dt
         zs[i + 1] = zs[i] + z_dot * dt
 
-    # Create time array for plotting
-    t = np.linspace(0, num_steps * dt, num_steps + 1)
+    return xs, ys, zs
+
+
+# ============================
+# Compact Trajectory Storage
+# ============================
+def store_trajectory(chunks, num_points, dtype=np.float64, keep_last=None):
+    """
+    Collect trajectory blocks into one interleaved array.
+    
+    Integration precision is not affected: blocks arrive in float64 and
+    are only cast when stored. With keep_last the array is a ring buffer
+    of that many rows that is overwritten as integration continues.
+    
+    Args:
+        chunks: Iterable of (n, ...) blocks of consecutive states
+        num_points: Total number of rows in all blocks
+        dtype: Storage dtype, e.g. np.float32 for plotting
+        keep_last: Keep only the last keep_last rows (default: all)
+        
+    Returns:
+        (rows, ...) array in chronological order, e.g. (N, 3) for one
+        system or (N, M, 3) for an ensemble
+    """
+    capacity = num_points if keep_last is None else max(1, min(keep_last, num_points))
+    out = None
+    written = 0
+    for block in chunks:
+        if out is None:
+            out = np.empty((capacity,) + np.shape(block)[1:], dtype=dtype)
+        n = len(block)
+        if n > capacity:
+            # Rows that would be overwritten within this block are skipped
+            block = block[n - capacity:]
+            written += n - capacity
+            n = capacity
+        pos = written % capacity
+        first = min(n, capacity - pos)
+        out[pos:pos + first] = block[:first]
+        out[:n - first] = block[first:]
+        written += n
+
+    if out is None:
+        raise ValueError("no trajectory blocks to store")
+    if written < capacity:
+        return out[:written]
+    start = written % capacity
+    return np.concatenate((out[start:], out[:start])) if start else out
+
+
+def trajectory_memory(num_points, members=1, dtype=np.float64, keep_last=None):
+    """
+    Compare a storage mode with three full float64 arrays per member.
+    
+    Args:
+        num_points: Points per member trajectory
+        members: Ensemble size M
+        dtype: Storage dtype
+        keep_last: Ring-buffer length, or None to keep every point
+        
+    Returns:
+        dict with baseline_bytes, stored_bytes, saved_bytes and ratio
+    """
+    rows = num_points if keep_last is None else max(1, min(keep_last, num_points))
+    baseline = 3 * members * num_points * np.dtype(np.float64).itemsize
+    stored = 3 * members * rows * np.dtype(dtype).itemsize
+    return {"baseline_bytes": baseline, "stored_bytes": stored,
+            "saved_bytes": baseline - stored, "ratio": baseline / stored}
+
+
+def simulate_compact(r_value, dt=0.01, num_steps=10000, dtype=np.float32,
+                     keep_last=None, initial_state=(0., 1., 1.05)):
+    """
+    Simulate the Lorenz system with Euler's method into compact storage.
+    
+    The trajectory matches simulate (integration stays in float64) but is
+    held as one interleaved (N, 3) array in dtype, optionally only the
+    last keep_last points.
+    
+    Args:
+        r_value: The r parameter value for the Lorenz system
+        dt: Time step size
+        num_steps: Number of simulation steps
+        dtype: Storage dtype
+        keep_last: Number of final points to keep (default: all)
+        initial_state: Starting point (x, y, z)
+        
+    Returns:
+        (N, 3) array of points, N = num_steps + 1 or keep_last
+    """
+    chunk_steps = 65536 if keep_last is None else max(1, min(keep_last, 65536))
+    return store_trajectory(
+        iter_trajectory_chunks(r_value, num_steps, dt, chunk_steps, initial_state),
+        num_steps + 1, dtype, keep_last)
+
+
+# ============================
+# Implicit Solvers
+# ============================
+# Euler with dt=0.01 diverges once r is large (already at r=100), so these
+# solvers take their step size from an error estimate instead. "rosenbrock"
+# is a linearly implicit method that steps the whole ensemble together;
+# "radau" and "bdf" run scipy's implicit solvers on the stacked system.
+SCIPY_IMPLICIT_METHODS = {"radau": Radau, "bdf": BDF}
+IMPLICIT_METHODS = ("rosenbrock",) + tuple(SCIPY_IMPLICIT_METHODS)
+
+
+def lorenz_jacobian(x, y, z, s=10, r=28, b=2.667):
+    """
+    Calculate the analytic Jacobian of the Lorenz system.
+    
+    Given:
+       x, y, z: a point (scalars or arrays of matching shape)
+       s, r, b: parameters defining the Lorenz attractor
+    Returns:
+       (..., 3, 3) array of d(x_dot, y_dot, z_dot)/d(x, y, z)
+    """
+    x, y, z = np.broadcast_arrays(x, y, z)
+    J = np.zeros(x.shape + (3, 3))
+    J[..., 0, 0] = -s
+    J[..., 0, 1] = s
+    J[..., 1, 0] = r - z
+    J[..., 1, 1] = -1.0
+    J[..., 1, 2] = -x
+    J[..., 2, 0] = y
+    J[..., 2, 1] = x
+    J[..., 2, 2] = -b
+    return J
+
+
+def lorenz_ivp(t, state, s=10, r=28, b=2.667):
+    """
+    Lorenz right-hand side in the form expected by scipy's solve_ivp.
+    
+    The state holds M systems back to back as (x0, y0, z0, x1, ...), and
+    may carry extra columns (shape (3M, k)) so vectorized=True works.
+    
+    Args:
+        t: Time (unused, the system is autonomous)
+        state: (3M,) or (3M, k) array of stacked states
+        s, r, b: scalars or length-M arrays of Lorenz parameters
+        
+    Returns:
+        Array of derivatives with the same shape as state
+    """
+    points = state.reshape((-1, 3) + state.shape[1:])
+    params = [np.reshape(p, np.shape(p) + (1,) * (state.ndim - 1))
+              for p in (s, r, b)]
+    derivs = np.empty_like(points)
+    derivs[:, 0], derivs[:, 1], derivs[:, 2] = lorenz(
+        points[:, 0], points[:, 1], points[:, 2], *params)
+    return derivs.reshape(state.shape)
+
+
+def lorenz_ivp_jacobian(t, state, s=10, r=28, b=2.667):
+    """
+    Jacobian of lorenz_ivp for solve_ivp's jac argument.
+    
+    Args:
+        t: Time (unused)
+        state: (3M,) array of stacked states
+        s, r, b: scalars or length-M arrays of Lorenz parameters
+        
+    Returns:
+        (3, 3) array for a single system, otherwise a sparse (3M, 3M)
+        block-diagonal matrix so the implicit solve stays O(M)
+    """
+    points = state.reshape(-1, 3)
+    blocks = lorenz_jacobian(points[:, 0], points[:, 1], points[:, 2], s, r, b)
+    M = len(points)
+    if M == 1:
+        return blocks[0]
+    return bsr_matrix((blocks, np.arange(M), np.arange(M + 1)),
+                      shape=(3 * M, 3 * M))
+
+
+def _inverse_3x3(A):
+    """Invert a stack of 3x3 matrices by cofactors (far cheaper than
+    np.linalg.inv for many tiny matrices)."""
+    a, b, c = A[..., 0, 0], A[..., 0, 1], A[..., 0, 2]
+    d, e, f = A[..., 1, 0], A[..., 1, 1], A[..., 1, 2]
+    g, h, i = A[..., 2, 0], A[..., 2, 1], A[..., 2, 2]
+    inv = np.empty_like(A)
+    inv[..., 0, 0] = e * i - f * h
+    inv[..., 1, 0] = f * g - d * i
+    inv[..., 2, 0] = d * h - e * g
+    inv[..., 0, 1] = c * h - b * i
+    inv[..., 1, 1] = a * i - c * g
+    inv[..., 2, 1] = b * g - a * h
+    inv[..., 0, 2] = b * f - c * e
+    inv[..., 1, 2] = c * d - a * f
+    inv[..., 2, 2] = a * e - b * d
+    det = a * inv[..., 0, 0] + b * inv[..., 1, 0] + c * inv[..., 2, 0]
+    inv /= det[..., None, None]
+    return inv
+
+
+def _rosenbrock_samples(states, s, r, b, t_eval, rtol, atol, stats):
+    """
+    Rosenbrock 2(3) steps (Shampine and Reichelt's ode23s) for an ensemble.
+    
+    Each step needs the (M, 3, 3) analytic Jacobians and one batched 3x3
+    inverse instead of Newton iterations. All members share the step size,
+    chosen from the worst member's error estimate.
+    """
+    d = 1.0 / (2.0 + np.sqrt(2.0))
+    e32 = 6.0 + np.sqrt(2.0)
+    identity = np.eye(3)
+    t_end = t_eval[-1]
+
+    y = states.copy()
+    F0 = lorenz_ensemble(y, s, r, b)
+    t = 0.0
+    h = min(0.01, t_end)
+    k = np.searchsorted(t_eval, 0.0, side="right")
+    steps = rejected = 0
+    nfev = 1
+
+    while k < len(t_eval):
+        last = h >= t_end - t
+        if last:
+            h = t_end - t
+        if h <= 1e-12 * max(1.0, abs(t)):
+            raise RuntimeError(f"rosenbrock step size underflow at t={t}")
+
+        J = lorenz_jacobian(y[:, 0], y[:, 1], y[:, 2], s, r, b)
+        W = identity - (h * d) * J
+        # LAPACK wins for a handful of systems, cofactors for ensembles
+        W_inv = np.linalg.inv(W) if len(y) <= 16 else _inverse_3x3(W)
+        k1 = np.einsum("mij,mj->mi", W_inv, F0)
+        F1 = lorenz_ensemble(y + (0.5 * h) * k1, s, r, b)
+        k2 = np.einsum("mij,mj->mi", W_inv, F1 - k1) + k1
+        y_new = y + h * k2
+        F2 = lorenz_ensemble(y_new, s, r, b)
+        k3 = np.einsum("mij,mj->mi", W_inv, F2 - e32 * (k2 - F1) - 2.0 * (k1 - F0))
+        nfev += 2
+
+        # Error of the 2nd order solution, RMS per member, worst member
+        err = (h / 6.0) * (k1 - 2.0 * k2 + k3)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err_norm = np.sqrt(np.mean((err / scale) ** 2, axis=1)).max()
+        if not err_norm <= 1.0:  # also rejects NaN
+            rejected += 1
+            h *= 0.2 if not np.isfinite(err_norm) else max(0.2, 0.8 * err_norm ** (-1 / 3))
+            continue
+
+        t_new = t_end if last else t + h
+        stop = np.searchsorted(t_eval, t_new, side="right")
+        if stop > k:
+            # Continuous extension of the step, exact at both ends
+            theta = ((t_eval[k:stop] - t) / h)[:, None, None]
+            c1 = theta * (1.0 - theta) / (1.0 - 2.0 * d)
+            c2 = theta * (theta - 2.0 * d) / (1.0 - 2.0 * d)
+            yield y + h * (c1 * k1 + c2 * k2)
+            k = stop
+
+        t, y, F0 = t_new, y_new, F2
+        steps += 1
+        h *= 5.0 if err_norm == 0 else min(5.0, max(0.2, 0.8 * err_norm ** (-1 / 3)))
+
+    stats.update(steps=steps, rejected=rejected, nfev=nfev,
+                 njev=steps + rejected, nlu=steps + rejected)
+
+
+def _scipy_samples(states, s, r, b, t_eval, method, rtol, atol, stats):
+    """Step one of scipy's implicit solvers and sample its dense output."""
+    M = len(states)
+    solver = SCIPY_IMPLICIT_METHODS[method](
+        lambda t, y: lorenz_ivp(t, y, s, r, b), 0.0, states.ravel(),
+        t_eval[-1], rtol=rtol, atol=atol, vectorized=True,
+        jac=lambda t, y: lorenz_ivp_jacobian(t, y, s, r, b))
+
+    k = np.searchsorted(t_eval, 0.0, side="right")
+    steps = 0
+    while k < len(t_eval):
+        message = solver.step()
+        if solver.status == "failed":
+            raise RuntimeError(f"{method} solver failed at t={solver.t}: {message}")
+        steps += 1
+        stop = np.searchsorted(t_eval, solver.t, side="right")
+        if stop > k:
+            ys = solver.dense_output()(t_eval[k:stop])
+            yield ys.T.reshape(stop - k, M, 3)
+            k = stop
+
+    stats.update(steps=steps, nfev=solver.nfev, njev=solver.njev,
+                 nlu=solver.nlu)
+
+
+def iter_implicit_samples(r_values, initial_states, t_eval, s_values=10,
+                          b_values=2.667, method="rosenbrock", rtol=1e-3,
+                          atol=1e-6, stats=None):
+    """
+    Integrate an ensemble with an implicit solver and sample it on a grid.
+    
+    The solver's own steps are set by rtol and atol; after each step the
+    dense output is evaluated at the grid times the step covered, so only
+    one step's worth of samples is held in memory.
+    
+    Args:
+        r_values: r parameter per member (scalar or length M)
+        initial_states: (3,) or (M, 3) array of states at t = 0
+        t_eval: Increasing sample times, all >= 0
+        s_values, b_values: s and b per member (scalar or length M)
+        method: One of IMPLICIT_METHODS
+        rtol, atol: Error tolerances that set the step size
+        stats: Optional dict that receives steps, nfev, njev and nlu
+        
+    Yields:
+        (n, M, 3) arrays of the states at consecutive times in t_eval
+    """
+    method = method.lower()
+    if method not in IMPLICIT_METHODS:
+        raise ValueError(f"method must be one of {IMPLICIT_METHODS}")
+    t_eval = np.asarray(t_eval, dtype=float)
+    initial_states = np.asarray(initial_states, dtype=float)
+    shape = np.broadcast_shapes(initial_states.shape[:-1], np.shape(r_values),
+                                np.shape(s_values), np.shape(b_values))
+    if len(shape) > 1:
+        raise ValueError("ensemble parameters must be scalars or 1-D arrays")
+    M = shape[0] if shape else 1
+    s, r, b = (np.broadcast_to(np.asarray(p, dtype=float), (M,))
+               for p in (s_values, r_values, b_values))
+    states = np.broadcast_to(initial_states, (M, 3)).copy()
+
+    # Samples at t = 0 come straight from the initial state
+    k = np.searchsorted(t_eval, 0.0, side="right")
+    if k:
+        yield np.broadcast_to(states, (k, M, 3)).copy()
+
+    if stats is None:
+        stats = {}
+    if method == "rosenbrock":
+        yield from _rosenbrock_samples(states, s, r, b, t_eval, rtol, atol, stats)
+    else:
+        yield from _scipy_samples(states, s, r, b, t_eval, method, rtol, atol, stats)
+    count("steps", stats["steps"])
+    count("rhs_evals", stats["nfev"])
+
+
+def simulate_implicit(r_value, dt=0.01, num_steps=10000, method="rosenbrock",
+                      rtol=1e-3, atol=1e-6, dtype=np.float64, keep_last=None):
+    """
+    Simulate the Lorenz system with an implicit solver.
+    
+    The trajectory is reported on the same grid as simulate (num_steps + 1
+    points spaced dt apart), but dt only sets the output spacing; the
+    solver picks its own steps from rtol and atol.
+    
+    Args:
+        r_value: The r parameter value for the Lorenz system
+        dt: Spacing of the output points
+        num_steps: Number of output intervals
+        method: One of IMPLICIT_METHODS
+        rtol, atol: Error tolerances
+        dtype, keep_last: Storage options as for store_trajectory
+        
+    Returns:
+        xs, ys, zs: Arrays of trajectory data (num_steps + 1 points each,
+            or the last keep_last points)
+        stats: dict with the solver's steps, nfev, njev and nlu
+    """
+    stats = {}
+    t_eval = np.arange(num_steps + 1) * dt
+    trajectory = store_trajectory(iter_implicit_samples(
+        r_value, (0., 1., 1.05), t_eval, method=method, rtol=rtol, atol=atol,
+        stats=stats), num_steps + 1, dtype, keep_last)[:, 0]
+    return trajectory[:, 0], trajectory[:, 1], trajectory[:, 2], stats
+
+
+def simulate_and_plot(r_value, method="euler", dtype=np.float64, keep_last=None):
+    """
+    Simulate the Lorenz system and plot the results.
+    
+    Creates a 4-panel visualization showing:
+    - 3D trajectory of the Lorenz attractor
+    - Time series plots for x(t), y(t), and z(t)
+    
+    Args:
+        r_value: The r parameter value for the Lorenz system
+        method: "euler" (fixed step) or one of IMPLICIT_METHODS, which
+            stay stable for large r
+        dtype: Storage dtype of the plotted trajectory (e.g. np.float32)
+        keep_last: Only keep and plot the last keep_last points
+    """
+    import matplotlib.pyplot as plt  # only needed when plotting
+    from mpl_toolkits.mplot3d import Axes3D  # Required for 3D projection
+
+    # Simulation parameters
+    dt = 0.01          # Time step size
+    num_steps = 10000  # Number of simulation steps
+
+    compact = np.dtype(dtype) != np.float64 or keep_last is not None
+    with stage("integrate"):
+        if method != "euler":
+            xs, ys, zs, stats = simulate_implicit(r_value, dt, num_steps, method,
+                                                  dtype=dtype, keep_last=keep_last)
+            print(f"{method}: {stats['steps']} steps, {stats['nfev']} RHS "
+                  f"evaluations, {stats['nlu']} LU decompositions")
+        elif compact:
+            xs, ys, zs = simulate_compact(r_value, dt, num_steps, dtype, keep_last).T
+            count("steps", num_steps)
+        else:
+            xs, ys, zs = simulate(r_value, dt, num_steps)
+            count("steps", num_steps)
+    if compact:
+        memory = trajectory_memory(num_steps + 1, 1, dtype, keep_last)
+        print(f"Trajectory storage: {memory['stored_bytes'] / 1024:.1f} KiB instead of "
+              f"{memory['baseline_bytes'] / 1024:.1f} KiB ({memory['ratio']:.1f}x smaller)")
+
+    # Create time array for plotting (the last len(xs) of num_steps + 1 points)
+    t = (num_steps + 1 - len(xs) + np.arange(len(xs))) * dt
 
     # Create figure with 4 subplots
     fig = plt.figure(figsize=(12, 8))
@@ -109,21 +602,293 @@ def simulate_and_plot(r_value):
     plt.show()
 
 
+# ============================
+# Bifurcation Sweep
+# ============================
+_sweep_shared = {}
+
+
+def _attach_sweep_output(shm_name, shape):
+    """Attach a pool worker to the shared bifurcation output array."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _sweep_shared["shm"] = shm
+    _sweep_shared["peaks"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _sweep_block(task):
+    """
+    Integrate one block of r values and record the local maxima of z.
+    
+    The r values are rebuilt from their indices so only a few integers are
+    sent to the worker, and the maxima are written straight into the shared
+    output array so nothing is pickled back to the parent.
+    """
+    (start, stop, r_min, r_max, num_r, dt, transient_steps, record_steps,
+     method, rtol, atol) = task
+    peaks = _sweep_shared["peaks"]
+    max_peaks = peaks.shape[1]
+
+    r = np.linspace(r_min, r_max, num_r)[start:stop]
+    state = np.empty((stop - start, 3))
+    state[:] = (0., 1., 1.05)
+
+    # z of every member at steps transient_steps .. transient_steps +
+    # record_steps + 1; the transient before that is dropped
+    if method == "euler":
+        z_rows = _euler_z_rows(state, r, dt, transient_steps, record_steps + 2)
+    else:
+        t_eval = (transient_steps + np.arange(record_steps + 2)) * dt
+        z_rows = (chunk[i, :, 2]
+                  for chunk in iter_implicit_samples(r, state, t_eval, method=method,
+                                                     rtol=rtol, atol=atol)
+                  for i in range(len(chunk)))
+
+    counts = np.zeros(stop - start, dtype=np.intp)
+    z_prev2 = next(z_rows).copy()
+    z_prev1 = next(z_rows).copy()
+
+    for z in z_rows:
+        # z_prev1 is a local maximum if it rose into it and fell out of it
+        is_peak = (z_prev1 > z_prev2) & (z_prev1 >= z) & (counts < max_peaks)
+        if is_peak.any():
+            idx = np.nonzero(is_peak)[0]
+            peaks[start + idx, counts[idx]] = z_prev1[idx]
+            counts[idx] += 1
+
+        z_prev2, z_prev1 = z_prev1, z_prev2
+        z_prev1[:] = z
+
+    return stop - start
+
+
+def _euler_z_rows(state, r, dt, skip_steps, num_rows):
+    """Advance an ensemble in place with Euler steps and yield z after each."""
+    for _ in range(skip_steps):
+        state += lorenz_ensemble(state, r=r) * dt
+    yield state[:, 2]
+    for _ in range(num_rows - 1):
+        state += lorenz_ensemble(state, r=r) * dt
+        yield state[:, 2]
+
+
+def bifurcation_sweep(r_min, r_max, num_r, dt=0.01, transient_steps=5000,
+                      record_steps=5000, max_peaks=64, processes=None,
+                      block_size=None, method="euler", rtol=1e-3, atol=1e-6):
+    """
+    Sweep r across a process pool and collect the local maxima of z.
+    
+    Each worker integrates a contiguous block of r values as one ensemble,
+    drops the transient, and writes the z maxima into a shared-memory array
+    owned by the parent process.
+    
+    Args:
+        r_min, r_max: Range of r values to sweep
+        num_r: Number of r values (resolution of the sweep)
+        dt: Time step size
+        transient_steps: Steps discarded before recording maxima
+        record_steps: Steps searched for maxima of z
+        max_peaks: Maximum number of maxima stored per r value
+        processes: Number of worker processes (default: all cores)
+        block_size: r values per task (default: chosen from num_r)
+        method: "euler", or one of IMPLICIT_METHODS for large r where
+            Euler with this dt diverges (dt then only sets the sampling)
+        rtol, atol: Error tolerances of the implicit methods
+        
+    Returns:
+        r_values: Array of the swept r values
+        peaks: (num_r, max_peaks) array of z maxima, padded with NaN
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if block_size is None:
+        # A few blocks per worker for load balancing, but large enough
+        # that each vectorized step amortizes the Python overhead
+        block_size = min(4096, max(64, -(-num_r // (4 * processes))))
+
+    shape = (num_r, max_peaks)
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(1, num_r * max_peaks * 8))
+    try:
+        peaks = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        peaks.fill(np.nan)
+
+        tasks = [(start, min(start + block_size, num_r), r_min, r_max, num_r,
+                  dt, transient_steps, record_steps, method, rtol, atol)
+                 for start in range(0, num_r, block_size)]
+
+        if processes == 1:
+            _attach_sweep_output(shm.name, shape)
+            try:
+                for task in tasks:
+                    _sweep_block(task)
+            finally:
+                _sweep_shared.pop("peaks", None)
+                _sweep_shared.pop("shm").close()
+        else:
+            with Pool(processes, initializer=_attach_sweep_output,
+                      initargs=(shm.name, shape)) as pool:
+                for _ in pool.imap_unordered(_sweep_block, tasks):
+                    pass
+
+        result = peaks.copy()
+        del peaks
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return np.linspace(r_min, r_max, num_r), result
+
+
+def plot_bifurcation(r_values, peaks):
+    """
+    Plot a bifurcation diagram from the output of bifurcation_sweep.
+    
+    Args:
+        r_values: Array of swept r values
+        peaks: (num_r, max_peaks) array of z maxima, padded with NaN
+    """
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    r_grid = np.broadcast_to(r_values[:, None], peaks.shape)
+    valid = ~np.isnan(peaks)
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(r_grid[valid], peaks[valid], ',k', alpha=0.5)
+    plt.xlabel("r")
+    plt.ylabel("Local maxima of z")
+    plt.title("Lorenz Bifurcation Diagram")
+    plt.tight_layout()
+    plt.show()
+
+
+# ============================
+# Streaming Trajectory Output
+# ============================
+def iter_trajectory_chunks(r_value, num_steps, dt=0.01, chunk_steps=65536,
+                           initial_state=(0., 1., 1.05)):
+    """
+    Integrate the Lorenz system and yield the trajectory in fixed-size blocks.
+    
+    Uses the same Euler update as simulate, but only one block of at most
+    chunk_steps points is held in memory at a time.
+    
+    Args:
+        r_value: The r parameter value for the Lorenz system
+        num_steps: Number of simulation steps
+        dt: Time step size
+        chunk_steps: Maximum number of points per yielded block
+        initial_state: Starting point (x, y, z)
+        
+    Yields:
+        (n, 3) arrays of consecutive points, starting with the initial state
+    """
+    x, y, z = (float(v) for v in initial_state)
+    yield np.array([[x, y, z]])
+
+    remaining = num_steps
+    while remaining > 0:
+        n = min(chunk_steps, remaining)
+        flat = []
+        append = flat.append
+        # Plain Python floats are much cheaper per step than NumPy scalars
+        for _ in range(n):
+            x_dot, y_dot, z_dot = lorenz(x, y, z, r=r_value)
+            x = x + x_dot * dt
+            y = y + y_dot * dt
+            z = z + z_dot * dt
+            append(x)
+            append(y)
+            append(z)
+        remaining -= n
+        yield np.array(flat).reshape(n, 3)
+
+
+def simulate_to_file(path, r_value, num_steps, dt=0.01, chunk_steps=65536,
+                     initial_state=(0., 1., 1.05)):
+    """
+    Stream a Lorenz trajectory of any length into a .npy file.
+    
+    The .npy header is written first and each block is appended as raw
+    float64 data, so peak memory is bounded by chunk_steps rather than
+    num_steps. The result is an ordinary (num_steps + 1, 3) .npy file.
+    
+    Args:
+        path: Output file path
+        r_value: The r parameter value for the Lorenz system
+        num_steps: Number of simulation steps
+        dt: Time step size
+        chunk_steps: Number of steps integrated per block
+        initial_state: Starting point (x, y, z)
+        
+    Returns:
+        Path of the written file
+    """
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)),
+              "fortran_order": False,
+              "shape": (num_steps + 1, 3)}
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_2_0(f, header)
+        for block in iter_trajectory_chunks(r_value, num_steps, dt,
+                                            chunk_steps, initial_state):
+            f.write(np.ascontiguousarray(block, dtype=np.float64).data)
+    return path
+
+
+def load_trajectory(path):
+    """
+    Open a trajectory written by simulate_to_file without reading it.
+    
+    Returns:
+        Read-only memory-mapped (num_steps + 1, 3) array; slicing it reads
+        only the requested part of the file
+    """
+    return np.load(path, mmap_mode="r")
+
+
 # ============================
 # Main Program Loop
 # ============================
 if __name__ == "__main__":
     while True:
-        user_input = input("Enter value for r (or type 'exit' to quit): ")
+        user_input = input("Enter value for r, optionally followed by a solver "
+                           "(euler, rosenbrock, radau, bdf), or type 'sweep' or 'exit': ")
         
         # Check for exit command
         if user_input.lower() == "exit":
             print("Exiting program.")
             break
 
+        # Sweep a range of r values in parallel
+        if user_input.lower() == "sweep":
+            try:
+                r_min = float(input("Enter minimum r: "))
+                r_max = float(input("Enter maximum r: "))
+                num_r = int(input("Enter number of r values: "))
+            except ValueError:
+                print("Invalid input. Please enter numeric values.")
+                continue
+            method = input("Enter solver (euler, rosenbrock, radau, bdf; "
+                           "blank for euler): ").strip().lower() or "euler"
+            if method != "euler" and method not in IMPLICIT_METHODS:
+                print("Unknown solver. Choose euler, rosenbrock, radau or bdf.")
+                continue
+            with stage("sweep"):
+                r_values, peaks = bifurcation_sweep(r_min, r_max, num_r,
+                                                    method=method)
+            with stage("plot"):
+                plot_bifurcation(r_values, peaks)
+            continue
+
         # Try to convert input to float and simulate
+        parts = user_input.lower().split()
+        method = parts[1] if len(parts) > 1 else "euler"
+        if method != "euler" and method not in IMPLICIT_METHODS:
+            print("Unknown solver. Choose euler, rosenbrock, radau or bdf.")
+            continue
         try:
-            r_value = float(user_input)
-            simulate_and_plot(r_value)
-        except ValueError:
-            print("Invalid input. Please enter a numeric value for r.")
\ No newline at end of file
+            r_value = float(parts[0])
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter a numeric value for r.")
+            continue
+        with stage("simulate_and_plot"):
+            simulate_and_plot(r_value, method)
\ No newline at end of file
@@ -2,7 +2,7 @@
 # Reece Gerhart Mason Lohnes
 # ----------------------------
 # Imports:
-# Numpy    Matplotlib    SciPy
+# Numpy    Matplotlib
 # ----------------------------
 # Approach to implementation:
 # Part 1: Define Taylor polynomial functions for parts (a) and (b)
@@ -12,19 +12,27 @@
 #         Display equations and key points on graphs
 # Part 2: Implement power series solution using recurrence relation
 #         Calculate coefficients using recurrence formula
-#         Evaluate and plot series solution for n <= 8
+#         Evaluate and plot series solution for n <= 8 (Horner's scheme)
+#         Pick the truncation order per point from the convergence radius
+#         Taylor series method: re-expand the recurrence at every step
 # Part 3: Define and solve CPU utilization ODE system
 #         Set initial conditions and time range
-#         Solve ODE numerically using odeint
+#         Solve the linear ODE with its closed-form solution
 #         Compute and visualize dynamics and steady-state
 # ============================
 
 # ============================
 # Imports
 # ============================
+from collections import OrderedDict
+from contextlib import nullcontext as stage
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import odeint  # Numerical ODE solver
+
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
 
 # ============================
 # Part 1: Taylor Polynomial Functions
@@ -56,6 +64,31 @@ def taylor_part_b(x):
 # ============================
 # Part 2: Power Series Functions
 # ============================
+# Bounded LRU cache of coefficient vectors keyed by (a0, a1, N)
+COEFF_CACHE_SIZE = 32
+_coeff_cache = OrderedDict()
+
+def _extend_coeffs(a, N):
+    """
+    Extend a coefficient vector to order N with the recurrence.
+    
+    Only the terms above the current order are computed, so a cached
+    order-M vector grows to order N in O(N - M) work.
+    
+    Args:
+        a: Array of coefficients [a0, ..., aM] with M >= 1
+        N: New maximum order (N > M)
+        
+    Returns:
+        Array of coefficients [a0, a1, ..., aN]
+    """
+    M = len(a) - 1
+    out = np.empty(N + 1)
+    out[:M + 1] = a
+    for n in range(M - 1, N - 1):
+        out[n+2] = -((n*n - n + 1) / (4*(n+2)*(n+1))) * out[n]
+    return out
+
 def series_coeffs(a0=0.0, a1=16.0, N=8):
     """
     Calculate power series coefficients using recurrence relation.
@@ -63,6 +96,10 @@ def series_coeffs(a0=0.0, a1=16.0, N=8):
     Recurrence: a_{n+2} = - (n² - n + 1)/(4(n+2)(n+1)) * a_n
     Homogeneous series with specified initial coefficients
     
+    Results are kept in a bounded LRU cache. A request for order N reuses
+    any cached vector of the same (a0, a1): a higher-order one is sliced,
+    and the highest lower-order one is extended incrementally.
+    
     Args:
         a0: Initial coefficient (default 0.0)
         a1: First coefficient (default 16.0)
@@ -71,27 +108,230 @@ def series_coeffs(a0=0.0, a1=16.0, N=8):
     Returns:
         Array of coefficients [a0, a1, ..., aN]
     """
-    a = np.zeros(N + 1)
-    a[0] = a0
-    a[1] = a1
-    for n in range(N - 1):
-        a[n+2] = -((n*n - n + 1) / (4*(n+2)*(n+1))) * a[n]
-    return a
+    key = (a0, a1, N)
+    if key in _coeff_cache:
+        _coeff_cache.move_to_end(key)
+        return _coeff_cache[key].copy()
+
+    # Find the best cached vector for the same a0, a1
+    base = None
+    for (c0, c1, M), cached in _coeff_cache.items():
+        if c0 == a0 and c1 == a1 and (base is None or M > len(base) - 1):
+            base = cached
+            if M >= N:
+                break
+
+    if base is not None and len(base) - 1 >= N:
+        a = base[:N + 1].copy()
+    elif base is not None:
+        a = _extend_coeffs(base, N)
+    else:
+        a = _extend_coeffs(np.array([a0, a1], dtype=float), N)
+
+    _coeff_cache[key] = a
+    if len(_coeff_cache) > COEFF_CACHE_SIZE:
+        _coeff_cache.popitem(last=False)
+    return a.copy()
 
 def series_solution(a_coeffs, x):
     """
-    Evaluate power series at a given x value.
+    Evaluate power series at the given x values using Horner's scheme.
+    
+    Computes: sum(a_i * x^i) for i = 0 to N as
+    a_0 + x(a_1 + x(a_2 + ... + x*a_N)), one multiply-add per
+    coefficient over the whole array of points.
+    
+    Args:
+        a_coeffs: Array of series coefficients
+        x: Point or array of points at which to evaluate series
+        
+    Returns:
+        Series value(s) at x, with the same shape as x
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.full(x.shape, a_coeffs[-1], dtype=float)
+    for c in a_coeffs[-2::-1]:
+        y *= x
+        y += c
+    return y if y.ndim else y[()]
+
+def series_radius(a_coeffs):
+    """
+    Estimate the radius of convergence from the coefficient ratios.
     
-    Computes: sum(a_i * x^i) for i = 0 to N
+    Uses the last two nonzero coefficients a_m and a_n (m < n):
+    R ≈ |a_m / a_n|^(1/(n-m)). Skipping zeros handles series such as the
+    Part 2 recurrence, where every other coefficient vanishes.
     
     Args:
         a_coeffs: Array of series coefficients
-        x: Point at which to evaluate series
         
     Returns:
-        Series value at x
+        Estimated radius (inf if fewer than two nonzero coefficients)
+    """
+    nonzero = np.nonzero(a_coeffs)[0]
+    if len(nonzero) < 2:
+        return np.inf
+    m, n = nonzero[-2], nonzero[-1]
+    return (abs(a_coeffs[m]) / abs(a_coeffs[n])) ** (1.0 / (n - m))
+
+def series_solution_adaptive(x, tol=1e-8, a0=0.0, a1=16.0, N_max=200, chunk_size=65536):
+    """
+    Evaluate the power series with the lowest order that meets tol per point.
+    
+    The radius R is estimated with series_radius. For each x the truncation
+    order is the last n whose term |a_n x^n|, scaled by the geometric tail
+    factor 1/(1 - (|x|/R)^2), is still above tol, so points near 0 use only
+    a few terms. Points with |x| >= R, or that would need more than N_max
+    terms, are evaluated at N_max and flagged as untrusted.
+    
+    Args:
+        x: Point or array of points
+        tol: Absolute truncation tolerance
+        a0: Initial coefficient (default 0.0)
+        a1: First coefficient (default 16.0)
+        N_max: Highest order allowed
+        chunk_size: Points processed per vectorized block
+        
+    Returns:
+        y: Series values at x
+        orders: Truncation order used at each point
+        trusted: True where the truncated series meets tol
+        (arrays shaped like x, or a float, int and bool for scalar x)
+    """
+    a = series_coeffs(a0=a0, a1=a1, N=N_max)
+    R = series_radius(a)
+    x = np.asarray(x, dtype=float)
+    x_flat = x.ravel()
+    y = np.empty(x_flat.shape)
+    orders = np.empty(x_flat.shape, dtype=int)
+    trusted = np.empty(x_flat.shape, dtype=bool)
+
+    n = np.arange(N_max + 1)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_a = np.log(np.abs(a))[:, None]
+
+    for start in range(0, len(x_flat), chunk_size):
+        xc = x_flat[start:start + chunk_size]
+        ratio = np.abs(xc) / R
+        inside = ratio < 1
+
+        # log of each term |a_n x^n| and of the tolerance left for the tail
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_terms = log_a + n * np.log(np.abs(xc))
+            log_tol = np.log(tol) + np.log1p(-np.minimum(ratio, 1.0) ** 2)
+            above = log_terms >= log_tol
+        order = np.max(above * n, axis=0)
+
+        # Converged only if the terms fell below tol before N_max
+        ok = inside & (order < N_max - 1)
+        order = np.where(ok, np.maximum(order, 1), N_max)
+
+        # Horner's scheme with each point's coefficients above its order dropped
+        yc = np.zeros(xc.shape)
+        for k in range(order.max(), -1, -1):
+            yc *= xc
+            np.add(yc, a[k], out=yc, where=k <= order)
+
+        y[start:start + len(xc)] = yc
+        orders[start:start + len(xc)] = order
+        trusted[start:start + len(xc)] = ok
+
+    if x.ndim == 0:
+        return y.item(), orders.item(), trusted.item()
+    return y.reshape(x.shape), orders.reshape(x.shape), trusted.reshape(x.shape)
+
+# ============================
+# Taylor Series Method
+# ============================
+def taylor_ode_coeffs(p, q, x0, y0, dy0, order):
+    """
+    Calculate Taylor coefficients of y about x0 for y'' + p(x)y' + q(x)y = 0.
+    
+    p and q are polynomials given by their coefficients in powers of x
+    (lowest first). They are re-expanded about x0, and the coefficients of
+    y = sum(c_n (x-x0)^n) follow from matching powers of (x-x0):
+    (n+2)(n+1)c_{n+2} = -sum_k [p_k (n-k+1) c_{n-k+1} + q_k c_{n-k}]
+    
+    Args:
+        p: Coefficients of p(x) in powers of x
+        q: Coefficients of q(x) in powers of x
+        x0: Expansion point
+        y0: y(x0)
+        dy0: y'(x0)
+        order: Maximum order of the series
+        
+    Returns:
+        Array of coefficients [c0, c1, ..., c_order]
+    """
+    shift = np.polynomial.Polynomial([x0, 1.0])
+    ps = np.polynomial.Polynomial(p)(shift).coef
+    qs = np.polynomial.Polynomial(q)(shift).coef
+
+    c = np.zeros(order + 1)
+    c[0] = y0
+    if order >= 1:
+        c[1] = dy0
+    for n in range(order - 1):
+        # Sum over the terms of p and q that touch known coefficients
+        kp = np.arange(min(n, len(ps) - 1) + 1)
+        kq = np.arange(min(n, len(qs) - 1) + 1)
+        s = np.dot(ps[kp] * (n - kp + 1), c[n - kp + 1]) + np.dot(qs[kq], c[n - kq])
+        c[n+2] = -s / ((n+2)*(n+1))
+    return c
+
+def taylor_integrate(p, q, x0, y0, dy0, x_end, order=24, tol=1e-16, h_max=None):
+    """
+    Integrate y'' + p(x)y' + q(x)y = 0 with the high-order Taylor method.
+    
+    At every step the solution is re-expanded about the current point with
+    taylor_ode_coeffs, and the step h is chosen so the last two terms of
+    the series, |c_n| h^n, stay below tol relative to the size of y.
+    
+    Args:
+        p: Coefficients of p(x) in powers of x
+        q: Coefficients of q(x) in powers of x
+        x0: Starting point
+        y0: y(x0)
+        dy0: y'(x0)
+        x_end: End of the integration interval
+        order: Order of the Taylor series used at each step
+        tol: Relative truncation tolerance per step
+        h_max: Optional upper bound on the step size
+        
+    Returns:
+        xs: Array of step points
+        ys: y at each step point
+        dys: y' at each step point
     """
-    return sum(a_coeffs[n] * x**n for n in range(len(a_coeffs)))
+    direction = 1.0 if x_end >= x0 else -1.0
+    xs, ys, dys = [x0], [y0], [dy0]
+    x, y, dy = x0, y0, dy0
+    deriv_scale = np.arange(1, order + 1)
+
+    while direction * (x_end - x) > 1e-14 * max(1.0, abs(x_end)):
+        c = taylor_ode_coeffs(p, q, x, y, dy, order)
+
+        # Largest h for which the trailing terms stay below tol
+        scale = tol * max(1.0, abs(y), abs(dy))
+        h = np.inf
+        for n in (order - 1, order):
+            if c[n] != 0:
+                h = min(h, (scale / abs(c[n])) ** (1.0 / n))
+        if h_max is not None:
+            h = min(h, h_max)
+        h = min(h, abs(x_end - x))
+        hs = direction * h
+
+        # Evaluate y and y' at the new point with Horner's scheme
+        y = series_solution(c, hs)
+        dy = series_solution(c[1:] * deriv_scale, hs)
+        x = x + hs
+        xs.append(x)
+        ys.append(y)
+        dys.append(dy)
+
+    return np.array(xs), np.array(ys), np.array(dys)
 
 # ============================
 # Part 3: CPU Utilization ODE
@@ -111,159 +351,216 @@ def cpu_util(u, t, lam, mu):
     """
     return lam * (1 - u) - mu * u
 
+def cpu_util_exact(lam, mu, u0, t):
+    """
+    Closed-form solution of the CPU utilization ODE.
+    
+    cpu_util is linear, so u(t) = u_ss + (u0 - u_ss)e^(-(lam+mu)t) with
+    steady state u_ss = lam/(lam+mu). Same signature as cpu_util_exact in
+    Project1/CPUWorkloads.py.
+    
+    Given:
+        lam: Job arrival rate (scalar or array)
+        mu: Job decay rate (scalar or array)
+        u0: Initial CPU utilization (scalar or array)
+        t: Time (scalar or 1-D array)
+        
+    Returns:
+        u(t): CPU utilization, shaped like lam, mu and u0 broadcast
+        together with the time axis last
+    """
+    lam, mu, u0 = (np.asarray(v, dtype=float)[..., None] for v in (lam, mu, u0))
+    u_ss = lam / (lam + mu)
+    return u_ss + (u0 - u_ss) * np.exp(-(lam + mu) * np.asarray(t, dtype=float))
+
 # ============================
 # Part 1: Visualization
 # ============================
-print("=" * 50)
-print("PART 1: TAYLOR POLYNOMIALS")
-print("=" * 50)
-
-# Set up the figure with two subplots
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# --- Part (a): Taylor Series around x=0 ---
-# Create x values for plotting
-x_a = np.linspace(0, 4, 500)
-y_a = taylor_part_a(x_a)
-
-# Plot the Taylor series curve
-ax1.plot(x_a, y_a, 'b-', linewidth=2)
-# Mark the evaluation point at x=3.5
-ax1.plot(3.5, taylor_part_a(3.5), 'ro', markersize=10)
-
-# Configure grid and labels
-ax1.grid(True, alpha=0.3)
-ax1.set_xlabel('x', fontsize=12)
-ax1.set_ylabel('y(x)', fontsize=12)
-ax1.set_title(r"Part (a): Taylor Series Expansion for $y'' - 2xy' + x^2y = 0$", fontsize=11)
-
-# Add text at bottom left with equation and point value
-ax1.text(0.5, -38, r'$f(x) = 1 - x - \frac{x^3}{3} - \frac{x^4}{12}$', 
-         fontsize=11, color='blue', verticalalignment='top')
-ax1.text(0.5, -42, f'y(3.5) ≈ {taylor_part_a(3.5):.2f}', 
-         fontsize=11, color='red', verticalalignment='top')
-
-# Set axis limits
-ax1.set_xlim(0, 4.2)
-ax1.set_ylim(-45, 5)
-
-# --- Part (b): Taylor Polynomial around x=3 ---
-# Create x values centered around x=3
-x_b = np.linspace(2.5, 3.5, 500)
-y_b = taylor_part_b(x_b)
-
-# Plot the Taylor polynomial curve
-ax2.plot(x_b, y_b, 'b-', linewidth=2, label=r'$f(x) = 6 + (x-3) - \frac{11}{2}(x-3)^2$')
-# Mark the expansion point
-ax2.axvline(x=3, color='brown', linestyle='--', linewidth=2, label='Expansion Point (x=3)')
-
-# Configure grid and labels
-ax2.grid(True, alpha=0.3)
-ax2.set_xlabel('x', fontsize=12)
-ax2.set_ylabel('y(x)', fontsize=12)
-ax2.set_title(r"Part (b): Second-Order Taylor Polynomial for $y'' - (x-2)y' + 2y = 0$", fontsize=11)
-ax2.legend(fontsize=10)
-
-# Set axis limits
-ax2.set_xlim(2.5, 3.5)
-ax2.set_ylim(4.2, 6.2)
-
-# Display Part 1 plots
-plt.tight_layout()
-plt.show()
-
-# Print Part 1 results
-print("\nPart (a): Taylor Series around x=0")
-print(f"y(x) = 1 - x - x³/3 - x⁴/12")
-print(f"y(3.5) = {taylor_part_a(3.5):.6f}")
-print()
-print("Part (b): Taylor Polynomial around x=3")
-print(f"y(x) = 6 + (x-3) - 11/2(x-3)²")
-print(f"y(3) = {taylor_part_b(3):.6f}")
-print(f"y'(3) = 1 (from initial condition)")
-print(f"y''(3) = -11 (calculated)")
+def part1():
+    """Plot and print the Taylor polynomials for parts (a) and (b)."""
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    print("=" * 50)
+    print("PART 1: TAYLOR POLYNOMIALS")
+    print("=" * 50)
+
+    # Set up the figure with two subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # --- Part (a): Taylor Series around x=0 ---
+    # Create x values for plotting
+    x_a = np.linspace(0, 4, 500)
+    y_a = taylor_part_a(x_a)
+
+    # Plot the Taylor series curve
+    ax1.plot(x_a, y_a, 'b-', linewidth=2)
+    # Mark the evaluation point at x=3.5
+    ax1.plot(3.5, taylor_part_a(3.5), 'ro', markersize=10)
+
+    # Configure grid and labels
+    ax1.grid(True, alpha=0.3)
+    ax1.set_xlabel('x', fontsize=12)
+    ax1.set_ylabel('y(x)', fontsize=12)
+    ax1.set_title(r"Part (a): Taylor Series Expansion for $y'' - 2xy' + x^2y = 0$", fontsize=11)
+
+    # Add text at bottom left with equation and point value
+    ax1.text(0.5, -38, r'$f(x) = 1 - x - \frac{x^3}{3} - \frac{x^4}{12}$', 
+             fontsize=11, color='blue', verticalalignment='top')
+    ax1.text(0.5, -42, f'y(3.5) ≈ {taylor_part_a(3.5):.2f}', 
+             fontsize=11, color='red', verticalalignment='top')
+
+    # Set axis limits
+    ax1.set_xlim(0, 4.2)
+    ax1.set_ylim(-45, 5)
+
+    # --- Part (b): Taylor Polynomial around x=3 ---
+    # Create x values centered around x=3
+    x_b = np.linspace(2.5, 3.5, 500)
+    y_b = taylor_part_b(x_b)
+
+    # Plot the Taylor polynomial curve
+    ax2.plot(x_b, y_b, 'b-', linewidth=2, label=r'$f(x) = 6 + (x-3) - \frac{11}{2}(x-3)^2$')
+    # Mark the expansion point
+    ax2.axvline(x=3, color='brown', linestyle='--', linewidth=2, label='Expansion Point (x=3)')
+
+    # Configure grid and labels
+    ax2.grid(True, alpha=0.3)
+    ax2.set_xlabel('x', fontsize=12)
+    ax2.set_ylabel('y(x)', fontsize=12)
+    ax2.set_title(r"Part (b): Second-Order Taylor Polynomial for $y'' - (x-2)y' + 2y = 0$", fontsize=11)
+    ax2.legend(fontsize=10)
+
+    # Set axis limits
+    ax2.set_xlim(2.5, 3.5)
+    ax2.set_ylim(4.2, 6.2)
+
+    # Display Part 1 plots
+    plt.tight_layout()
+    plt.show()
+
+    # Print Part 1 results
+    print("\nPart (a): Taylor Series around x=0")
+    print(f"y(x) = 1 - x - x³/3 - x⁴/12")
+    print(f"y(3.5) = {taylor_part_a(3.5):.6f}")
+    print()
+    print("Part (b): Taylor Polynomial around x=3")
+    print(f"y(x) = 6 + (x-3) - 11/2(x-3)²")
+    print(f"y(3) = {taylor_part_b(3):.6f}")
+    print(f"y'(3) = 1 (from initial condition)")
+    print(f"y''(3) = -11 (calculated)")
 
 # ============================
 # Part 2: Power Series Solution
 # ============================
-print("\n" + "=" * 50)
-print("PART 2: POWER SERIES SOLUTIONS")
-print("=" * 50)
-
-# --- User Parameters ---
-a0 = 0.0
-a1 = 16.0
-N_series = 8    
-x_min, x_max = 0.0, 9.0
-n_points = 1000
-
-# --- Build series and evaluate ---
-coeffs = series_coeffs(a0=a0, a1=a1, N=N_series)
-print("\nSeries coefficients a0..aN:")
-for i, c in enumerate(coeffs):
-    print(f"  a_{i} = {c:.8f}")
-
-# Evaluate series at each point
-x_vals = np.linspace(x_min, x_max, n_points)
-y_vals = [series_solution(coeffs, xi) for xi in x_vals]
-
-print(f"\nPower Series Solution (n <= {N_series})")
-
-# --- Plot Part 2 ---
-plt.figure(figsize=(10, 6))
-plt.plot(x_vals, y_vals, color='blue', linestyle='-', linewidth=2, 
-         label=f"Power Series Solution n<={N_series}")
-
-plt.title(f"Part 2: Power Series Solution with n <= {N_series}", 
-          fontsize=14, fontweight='bold')
-plt.xlabel("x", fontsize=12)
-plt.ylabel("y(x)", fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.legend(fontsize=10)
-plt.tight_layout()
-plt.show()
-
-print("\n" + "=" * 50)
-print("ALL COMPUTATIONS COMPLETE")
-print("=" * 50)
+def part2():
+    """Build, print and plot the power series solution."""
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    print("\n" + "=" * 50)
+    print("PART 2: POWER SERIES SOLUTIONS")
+    print("=" * 50)
+
+    # --- User Parameters ---
+    a0 = 0.0
+    a1 = 16.0
+    N_series = 8    
+    x_min, x_max = 0.0, 9.0
+    n_points = 1000
+
+    # --- Build series and evaluate ---
+    with stage("series_coeffs"):
+        coeffs = series_coeffs(a0=a0, a1=a1, N=N_series)
+    print("\nSeries coefficients a0..aN:")
+    for i, c in enumerate(coeffs):
+        print(f"  a_{i} = {c:.8f}")
+
+    # Evaluate series at each point
+    x_vals = np.linspace(x_min, x_max, n_points)
+    with stage("series_eval"):
+        y_vals = series_solution(coeffs, x_vals)
+        count("points", len(x_vals))
+
+    print(f"\nPower Series Solution (n <= {N_series})")
+
+    # --- Adaptive truncation order ---
+    with stage("series_adaptive"):
+        R = series_radius(series_coeffs(a0=a0, a1=a1, N=60))
+        _, orders, trusted = series_solution_adaptive(x_vals, tol=1e-8, a0=a0, a1=a1)
+        count("terms", int(orders.sum()))
+    print(f"Estimated radius of convergence: {R:.4f}")
+    print(f"Adaptive orders for tol=1e-8: {orders[trusted].min()} to {orders[trusted].max()}")
+    print(f"Points outside the trustworthy region (x >= {R:.2f}): {np.count_nonzero(~trusted)} of {len(x_vals)}")
+
+    # --- Plot Part 2 ---
+    plt.figure(figsize=(10, 6))
+    plt.plot(x_vals, y_vals, color='blue', linestyle='-', linewidth=2, 
+             label=f"Power Series Solution n<={N_series}")
+
+    plt.title(f"Part 2: Power Series Solution with n <= {N_series}", 
+              fontsize=14, fontweight='bold')
+    plt.xlabel("x", fontsize=12)
+    plt.ylabel("y(x)", fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=10)
+    plt.tight_layout()
+    plt.show()
+
+    print("\n" + "=" * 50)
+    print("ALL COMPUTATIONS COMPLETE")
+    print("=" * 50)
 
 # ============================
 # Part 3: CPU Utilization Dynamics
 # ============================
-print("\n" + "=" * 50)
-print("PART 3: CPU UTILIZATION DYNAMICS")
-print("=" * 50)
-
-# --- Parameters ---
-lam = 2.0      # Job arrival rate
-mu = 1.0       # Job decay rate
-u0 = 0.2       # Initial condition
-t = np.linspace(0, 10, 10000)  # Time grid from 0 to 10
-
-print(f"\nParameters:")
-print(f"  λ (arrival rate) = {lam}")
-print(f"  μ (decay rate) = {mu}")
-print(f"  u(0) (initial utilization) = {u0}")
-print(f"  Steady-state utilization = {lam/(lam+mu):.4f}")
-
-# --- Solve ODE ---
-sol = odeint(cpu_util, u0, t, args=(lam, mu))
-u = sol[:, 0]  # Extract solution
-
-# --- Create Graph ---
-plt.figure(figsize=(8, 5))
-plt.plot(t, u, label="CPU Utilization", linewidth=2)
-plt.axhline(y=lam/(lam+mu), linestyle="--", color='red', 
-            label="Steady-State Utilization", linewidth=2)
-
-plt.xlabel("Time (s)", fontsize=12)
-plt.ylabel("CPU Utilization (fraction)", fontsize=12)
-plt.title("CPU Utilization Dynamics in a Computer System", fontsize=13)
-plt.legend(fontsize=10)
-plt.grid(True, linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.show()
-
-print("\n" + "=" * 50)
-print("ALL PARTS COMPLETE")
-print("=" * 50)
\ No newline at end of file
+def part3():
+    """Solve and plot the CPU utilization dynamics."""
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    print("\n" + "=" * 50)
+    print("PART 3: CPU UTILIZATION DYNAMICS")
+    print("=" * 50)
+
+    # --- Parameters ---
+    lam = 2.0      # Job arrival rate
+    mu = 1.0       # Job decay rate
+    u0 = 0.2       # Initial condition
+    t = np.linspace(0, 10, 10000)  # Time grid from 0 to 10
+
+    print(f"\nParameters:")
+    print(f"  λ (arrival rate) = {lam}")
+    print(f"  μ (decay rate) = {mu}")
+    print(f"  u(0) (initial utilization) = {u0}")
+    print(f"  Steady-state utilization = {lam/(lam+mu):.4f}")
+
+    # --- Solve ODE (linear, so use the exact solution) ---
+    with stage("cpu_util_solve"):
+        u = cpu_util_exact(lam, mu, u0, t)
+
+    # --- Create Graph ---
+    plt.figure(figsize=(8, 5))
+    plt.plot(t, u, label="CPU Utilization", linewidth=2)
+    plt.axhline(y=lam/(lam+mu), linestyle="--", color='red', 
+                label="Steady-State Utilization", linewidth=2)
+
+    plt.xlabel("Time (s)", fontsize=12)
+    plt.ylabel("CPU Utilization (fraction)", fontsize=12)
+    plt.title("CPU Utilization Dynamics in a Computer System", fontsize=13)
+    plt.legend(fontsize=10)
+    plt.grid(True, linestyle="--", alpha=0.6)
+    plt.tight_layout()
+    plt.show()
+
+    print("\n" + "=" * 50)
+    print("ALL PARTS COMPLETE")
+    print("=" * 50)
+
+def main():
+    with stage("part1"):
+        part1()
+    with stage("part2"):
+        part2()
+    with stage("part3"):
+        part3()
+
+if __name__ == "__main__":
+    main()
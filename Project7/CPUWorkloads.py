@@ -2,19 +2,31 @@
 # Reece Gerhart Mason Lohnes
 # ----------------------------
 # Imports:
-# Numpy    Matplotlib
+# Numpy    Matplotlib    SciPy
 # ----------------------------
 # Approach to implementation:
 # Create Lorenz Function
 # Create a Simulator Function
+# Estimate the maximal Lyapunov exponent
+# Implicit solvers with the analytic Jacobian for large r (from Project 5)
 # Take Inputs For R
 # Output Graphs
 # ============================
 # ============================
 # Imports
 # ============================
+import os
+import sys
+from contextlib import nullcontext as stage
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
+
 
 def lorenz(x, y, z, s=10, r=28, b=2.667):
     """
@@ -31,10 +43,252 @@ def lorenz(x, y, z, s=10, r=28, b=2.667):
     return x_dot, y_dot, z_dot
 
 
-def simulate_and_plot(r_value):
-    dt = 0.01
-    num_steps = 10000
+def lorenz_ensemble(states, s=10, r=28, b=2.667):
+    """
+    Given:
+       states: (M, 3) array of points (x, y, z), one row per member
+       s, r, b: scalars or length-M arrays of Lorenz parameters
+    Returns:
+       (M, 3) array of the derivatives at every point
+    """
+    derivs = np.empty_like(states)
+    derivs[:, 0], derivs[:, 1], derivs[:, 2] = lorenz(
+        states[:, 0], states[:, 1], states[:, 2], s=s, r=r, b=b)
+    return derivs
+
+
+def simulate_ensemble(r_values, initial_states, s_values=10, b_values=2.667,
+                      dt=0.01, num_steps=10000):
+    """
+    Given:
+       r_values, s_values, b_values: scalars or length-M parameter arrays
+       initial_states: (3,) or (M, 3) starting points
+       dt, num_steps: Euler step size and number of steps
+    Returns:
+       (num_steps + 1, M, 3) array holding every member's trajectory
+    """
+    initial_states = np.asarray(initial_states, dtype=float)
+    shape = np.broadcast_shapes(initial_states.shape[:-1], np.shape(r_values),
+                                np.shape(s_values), np.shape(b_values))
+    if len(shape) > 1:
+        raise ValueError("ensemble parameters must be scalars or 1-D arrays")
+    M = shape[0] if shape else 1
+
+    r = np.broadcast_to(np.asarray(r_values, dtype=float), (M,))
+    s = np.broadcast_to(np.asarray(s_values, dtype=float), (M,))
+    b = np.broadcast_to(np.asarray(b_values, dtype=float), (M,))
+
+    # One contiguous block: trajectory[i] is the (M, 3) state at step i
+    trajectory = np.empty((num_steps + 1, M, 3))
+    trajectory[0] = initial_states
+
+    # Integrate every member at once using Euler's method
+    for i in range(num_steps):
+        derivs = lorenz_ensemble(trajectory[i], s=s, r=r, b=b)
+        np.multiply(derivs, dt, out=derivs)
+        np.add(trajectory[i], derivs, out=trajectory[i + 1])
+
+    return trajectory
+
+
+def lorenz_tangent(x, y, z, vx, vy, vz, s=10, r=28, b=2.667):
+    """
+    Given:
+       x, y, z: a point on the trajectory
+       vx, vy, vz: a tangent (perturbation) vector at that point
+       s, r, b: parameters defining the Lorenz attractor
+    Returns:
+       The Jacobian of lorenz at (x, y, z) applied to the tangent vector
+    """
+    vx_dot = s * (vy - vx)
+    vy_dot = (r - z) * vx - vy - x * vz
+    vz_dot = y * vx + x * vy - b * vz
+    return vx_dot, vy_dot, vz_dot
+
+
+def lyapunov_exponent(s_values=10, r_values=28, b_values=2.667, dt=0.01,
+                      num_steps=10000, transient_steps=1000, renorm_every=10,
+                      initial_state=(0., 1., 1.05), block_size=8192):
+    """
+    Given:
+       s_values, r_values, b_values: parameter grids (broadcast together)
+       dt: RK4 step size for the trajectory and its tangent vector
+       num_steps: steps averaged over after the transient, at least
+          renorm_every; steps after the last renormalization are not counted
+       transient_steps: steps discarded while the tangent vector aligns,
+          rounded up to a multiple of renorm_every
+       renorm_every: steps between renormalizations of the tangent vector
+       initial_state: starting point (x, y, z) shared by every grid point
+       block_size: grid points integrated together; larger blocks amortize
+          NumPy's per-call overhead, smaller ones keep the work arrays in cache
+    Returns:
+       Maximal Lyapunov exponent for every (s, r, b) point, shaped like the
+       broadcast parameter grid. Positive values indicate chaos.
+
+    With the default steps each point costs 11000 RK4 steps of the 6-variable
+    system, about 165 array element operations per step, which bounds pure
+    NumPy at roughly 700 points per second on one core (measured on a 1-core
+    Xeon for 10000-point sweeps; about 400 per second for 1000 points, where
+    per-call overhead dominates). Faster sweeps need fewer steps or more cores.
+    """
+    if renorm_every < 1 or num_steps < renorm_every:
+        raise ValueError("num_steps must be at least renorm_every (and renorm_every at least 1)")
+    # A renormalization interval must not straddle the end of the transient,
+    # or its growth would be partly transient growth
+    transient_steps = -(-transient_steps // renorm_every) * renorm_every
+    counted = num_steps // renorm_every
 
+    s, r, b = np.broadcast_arrays(np.asarray(s_values, dtype=float),
+                                  np.asarray(r_values, dtype=float),
+                                  np.asarray(b_values, dtype=float))
+    grid_shape = s.shape
+    s, r, b = s.ravel(), r.ravel(), b.ravel()
+
+    # Blocks of points small enough for their work arrays to stay in cache
+    log_growth = np.empty(s.size)
+    for start in range(0, s.size, block_size):
+        block = slice(start, start + block_size)
+        log_growth[block] = _lyapunov_block(s[block], r[block], b[block], dt,
+                                            transient_steps, counted, renorm_every,
+                                            initial_state)
+    return (log_growth / (counted * renorm_every * dt)).reshape(grid_shape)
+
+
+def _lorenz_tangent_into(u, out, tmp, s, r, b):
+    """
+    Given:
+       u: (6, M) array, rows x, y, z, vx, vy, vz
+       out: (6, M) array that receives lorenz and lorenz_tangent at u
+       tmp: (M,) scratch array
+       s, r, b: length-M parameter arrays
+    Same values as lorenz and lorenz_tangent, computed without temporaries.
+    """
+    x, y, z, vx, vy, vz = u
+    dx, dy, dz, dvx, dvy, dvz = out
+    np.subtract(y, x, out=dx)
+    dx *= s
+    np.multiply(r, x, out=dy)
+    dy -= y
+    np.multiply(x, z, out=tmp)
+    dy -= tmp
+    np.multiply(x, y, out=dz)
+    np.multiply(b, z, out=tmp)
+    dz -= tmp
+    np.subtract(vy, vx, out=dvx)
+    dvx *= s
+    np.subtract(r, z, out=dvy)
+    dvy *= vx
+    dvy -= vy
+    np.multiply(x, vz, out=tmp)
+    dvy -= tmp
+    np.multiply(y, vx, out=dvz)
+    np.multiply(x, vy, out=tmp)
+    dvz += tmp
+    np.multiply(b, vz, out=tmp)
+    dvz -= tmp
+
+
+def _lyapunov_block(s, r, b, dt, transient_steps, counted, renorm_every,
+                    initial_state):
+    """
+    Given:
+       s, r, b: length-M parameter arrays
+       remaining arguments: as for lyapunov_exponent (after its checks)
+    Returns:
+       Summed log growth of the tangent vector over the counted
+       renormalizations, for each of the M points
+    """
+    m = s.size
+    # Rows 0-2 hold the state and rows 3-5 the tangent vector of every point;
+    # every RK4 stage writes into these preallocated arrays
+    u = np.empty((6, m))
+    u[:3] = np.asarray(initial_state, dtype=float)[:, None]
+    u[3:] = 1 / np.sqrt(3)
+    k = np.empty_like(u)
+    acc = np.empty_like(u)
+    stage_u = np.empty_like(u)
+    tmp = np.empty(m)
+    norm = np.empty(m)
+    growth = np.ones(m)
+    log_growth = np.zeros(m)
+
+    # Norm products are turned into logs in batches, which is safe because
+    # one renormalization interval changes the norm by a bounded factor
+    log_every = 16
+    pending = 0
+    for i in range(transient_steps + counted * renorm_every):
+        # RK4 for the trajectory and its tangent vector together:
+        # acc collects k1 + 2 k2 + 2 k3 + k4
+        _lorenz_tangent_into(u, acc, tmp, s, r, b)
+        np.multiply(acc, dt/2, out=stage_u)
+        stage_u += u
+        _lorenz_tangent_into(stage_u, k, tmp, s, r, b)
+        np.multiply(k, dt/2, out=stage_u)
+        stage_u += u
+        k *= 2
+        acc += k
+        _lorenz_tangent_into(stage_u, k, tmp, s, r, b)
+        np.multiply(k, dt, out=stage_u)
+        stage_u += u
+        k *= 2
+        acc += k
+        _lorenz_tangent_into(stage_u, k, tmp, s, r, b)
+        acc += k
+        acc *= dt/6
+        u += acc
+
+        # Renormalize before the tangent vector overflows, keeping its growth
+        if (i + 1) % renorm_every == 0:
+            v = u[3:]
+            np.multiply(v[0], v[0], out=norm)
+            for row in v[1:]:
+                np.multiply(row, row, out=tmp)
+                norm += tmp
+            np.sqrt(norm, out=norm)
+            v /= norm
+            if i >= transient_steps:
+                growth *= norm
+                pending += 1
+                if pending == log_every:
+                    log_growth += np.log(growth)
+                    growth.fill(1.0)
+                    pending = 0
+    return log_growth + np.log(growth)
+
+
+# Euler with dt=0.01 diverges once r is large (already at r=100), so these
+# solvers take their step size from an error estimate instead. They are the
+# ones in Project5/CPUWorkloads.py, loaded from there rather than copied.
+def _lorenz_workloads():
+    """
+    Returns:
+       Project5/CPUWorkloads.py as a module (loaded on first use through
+       Tools/ProjectModules.py)
+    """
+    if "ProjectModules" not in sys.modules:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     os.pardir, "Tools"))
+    from ProjectModules import load_project
+    return load_project("lorenz_workloads")
+
+
+def simulate_implicit(r_value, dt=0.01, num_steps=10000, method="rosenbrock",
+                      rtol=1e-3, atol=1e-6):
+    """
+    Given:
+       r_value: the r parameter value for the Lorenz system
+       dt, num_steps: spacing and number of output intervals (the solver
+           picks its own steps from rtol and atol)
+       method: one of IMPLICIT_METHODS in Project5/CPUWorkloads.py
+    Returns:
+       xs, ys, zs: trajectory on the same grid as simulate
+       stats: dict with the solver's steps, nfev, njev and nlu
+    """
+    return _lorenz_workloads().simulate_implicit(r_value, dt, num_steps, method,
+                                                 rtol, atol)
+
+
+def simulate(r_value, dt=0.01, num_steps=10000):
     # Allocate arrays
     xs = np.empty(num_steps + 1)
     ys = np.empty(num_steps + 1)
@@ -50,6 +304,23 @@ def simulate_and_plot(r_value):
         ys[i + 1] = ys[i] + y_dot * dt
         zs[i + 1] = zs[i] + z_dot * dt
 
+    return xs, ys, zs
+
+
+def simulate_and_plot(r_value, method="euler"):
+    import matplotlib.pyplot as plt  # only needed when plotting
+
+    dt = 0.01
+    num_steps = 10000
+    with stage("integrate"):
+        if method == "euler":
+            xs, ys, zs = simulate(r_value, dt, num_steps)
+            count("steps", num_steps)
+        else:
+            xs, ys, zs, stats = simulate_implicit(r_value, dt, num_steps, method)
+            print(f"{method}: {stats['steps']} steps, {stats['nfev']} RHS "
+                  f"evaluations, {stats['nlu']} LU decompositions")
+
     # Time array
     t = np.linspace(0, num_steps * dt, num_steps + 1)
 
@@ -90,14 +361,23 @@ def simulate_and_plot(r_value):
 
 
 # --- Main Loop ---
-while True:
-    user_input = input("Enter value for r (or type 'exit' to quit): ")
-    if user_input.lower() == "exit":
-        print("Exiting program.")
-        break
-
-    try:
-        r_value = float(user_input)
-        simulate_and_plot(r_value)
-    except ValueError:
-        print("Invalid input. Please enter a numeric value for r.")
+if __name__ == "__main__":
+    while True:
+        user_input = input("Enter value for r, optionally followed by a solver "
+                           "(euler, rosenbrock, radau, bdf), or type 'exit' to quit: ")
+        if user_input.lower() == "exit":
+            print("Exiting program.")
+            break
+
+        parts = user_input.lower().split()
+        method = parts[1] if len(parts) > 1 else "euler"
+        if method != "euler" and method not in _lorenz_workloads().IMPLICIT_METHODS:
+            print("Unknown solver. Choose euler, rosenbrock, radau or bdf.")
+            continue
+        try:
+            r_value = float(parts[0])
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter a numeric value for r.")
+            continue
+        with stage("simulate_and_plot"):
+            simulate_and_plot(r_value, method)
@@ -11,16 +11,33 @@ arrival rate (λ) and service rate (μ) are scaled by a factor k.
 Packages Used:
 - numpy: For numerical computations
 - matplotlib: For creating visualizations
+- scipy: For confidence intervals of replicated simulations and the sparse
+  transient (uniformization) solver
 
 Approach:
 1. Define original λ and μ values
 2. Create range of scaling factors k
-3. Calculate performance metrics for each k value
+3. Calculate performance metrics for all k values at once
 4. Plot all four metrics in a 2x2 subplot grid
+5. Check the analytic metrics against a simulated queue
+6. Replicate simulations in parallel for confidence intervals
+7. Solve the transient queue-length distribution by uniformization
 """
 
+import os
+from contextlib import nullcontext as stage
+from multiprocessing import Pool
+
 import numpy as np
-import matplotlib.pyplot as plt
+from scipy import sparse
+from scipy.special import gammaln
+from scipy.stats import poisson
+from scipy.stats import t as student_t
+
+# stage() above and count() below are no-op timing hooks that
+# Tools/Instrumentation.attach replaces with recording versions
+def count(name, n=1):
+    pass
 
 def calculate_mm1_metrics(lambda_val, mu_val, k):
     """
@@ -49,8 +66,432 @@ def calculate_mm1_metrics(lambda_val, mu_val, k):
     
     return rho, throughput, E_N, E_T
 
+def erlang_c(c, a):
+    """
+    Probability that an arriving job waits in an M/M/c queue (Erlang C).
+    
+    Uses the Erlang B recurrence B(n) = a*B(n-1) / (n + a*B(n-1)), which
+    avoids the factorials and powers of the textbook formula, and then
+    C = B / (1 - rho*(1 - B)). c and a may be arrays of any broadcastable
+    shape; each recurrence step only updates the entries with n <= c.
+    
+    Parameters:
+    - c: Number of servers (positive integers)
+    - a: Offered load lambda/mu
+    
+    Returns:
+    - Erlang C probability of waiting (NaN where a >= c)
+    """
+    c, a = np.broadcast_arrays(np.asarray(c), np.asarray(a, dtype=float))
+
+    # Preallocated buffers: at 10^7 points allocation costs more than math
+    B = np.ones(a.shape)
+    aB = np.empty(a.shape)
+    step = np.empty(a.shape)
+    active = np.empty(a.shape, dtype=bool)
+    for n in range(1, int(c.max(initial=1)) + 1):
+        np.multiply(a, B, out=aB)
+        np.add(aB, n, out=step)
+        np.divide(aB, step, out=step)
+        np.greater_equal(c, n, out=active)
+        np.copyto(B, step, where=active)
+
+    rho = a / c
+    with np.errstate(invalid="ignore", divide="ignore"):
+        C = B / (1 - rho * (1 - B))
+    return np.where(rho < 1, C, np.nan)
+
+def evaluate_queue_grid(lambda_vals, mu_vals, k_values=1.0, c=None, K=None):
+    """
+    Evaluate queue metrics over broadcast grids of lambda, mu and k.
+    
+    The model is M/M/1 by default, M/M/c when c is given and M/M/1/K when
+    the buffer size K is given. All inputs (including c and K) broadcast
+    together, so a whole capacity-planning grid is one call.
+    
+    Parameters:
+    - lambda_vals: Original arrival rates
+    - mu_vals: Original service rates
+    - k_values: Scaling factors applied to both rates
+    - c: Number of servers for M/M/c
+    - K: System capacity for M/M/1/K
+    
+    Returns:
+    - Dict of arrays with the broadcast shape: rho, throughput, E_N, E_T
+      and stable, plus P_wait (M/M/c) or P_block (M/M/1/K). Metrics are
+      NaN where the queue is unstable.
+    """
+    lambda_new = np.asarray(k_values, dtype=float) * np.asarray(lambda_vals, dtype=float)
+    mu_new = np.asarray(k_values, dtype=float) * np.asarray(mu_vals, dtype=float)
+    lambda_new, mu_new = np.broadcast_arrays(lambda_new, mu_new)
+    a = lambda_new / mu_new  # offered load
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        if K is not None:
+            # M/M/1/K is always stable. For rho > 1 the distribution is
+            # mirrored (K - N uses 1/rho), so powers never exceed 1.
+            K = np.asarray(K)
+            high = a > 1
+            q = np.where(high, 1 / a, a)
+            qK1 = -np.expm1((K + 1) * np.log(q))       # 1 - q^(K+1)
+            mean_q = q / (1 - q) - (K + 1) * (1 - qK1) / qK1
+            P_block = np.where(high, (1 - q) / qK1, (1 - q) * q**K / qK1)
+            E_N = np.where(high, K - mean_q, mean_q)
+            at_one = np.isclose(a, 1, rtol=1e-9, atol=0)
+            P_block = np.where(at_one, 1 / (K + 1), P_block)
+            E_N = np.where(at_one, K / 2, E_N)
+            throughput = lambda_new * (1 - P_block)
+            metrics = {
+                "rho": throughput / mu_new,
+                "throughput": throughput,
+                "E_N": E_N,
+                "E_T": E_N / throughput,
+                "P_block": P_block,
+                "stable": np.ones(a.shape, dtype=bool),
+            }
+        elif c is not None:
+            c = np.asarray(c)
+            rho = a / c
+            stable = rho < 1
+            P_wait = erlang_c(c, a)
+            E_N = P_wait * rho / (1 - rho) + a
+            metrics = {
+                "rho": rho,
+                "throughput": lambda_new,
+                "E_N": E_N,
+                "E_T": E_N / lambda_new,
+                "P_wait": P_wait,
+                "stable": stable,
+            }
+        else:
+            rho = a
+            stable = rho < 1
+            metrics = {
+                "rho": rho,
+                "throughput": lambda_new,
+                "E_N": rho / (1 - rho),
+                "E_T": 1 / (mu_new - lambda_new),
+                "stable": stable,
+            }
+
+    # Mask everything that is undefined for an unstable queue
+    shape = np.broadcast_shapes(*(np.shape(v) for v in metrics.values()))
+    for name, value in metrics.items():
+        value = np.broadcast_to(value, shape)
+        if name != "stable":
+            value = np.where(metrics["stable"], value, np.nan)
+        metrics[name] = value
+    return metrics
+
+def mm1_generator(lambda_val, mu_val, k=1.0, capacity=1000):
+    """
+    Generator matrix of the M/M/1 queue truncated at a capacity bound.
+    
+    The birth-death chain on 0..capacity is tridiagonal: arrivals move
+    n -> n+1 at rate k*lambda (blocked at the capacity, so the truncation
+    is the M/M/1/K queue) and services move n -> n-1 at rate k*mu.
+    
+    Parameters:
+    - lambda_val: Original arrival rate
+    - mu_val: Original service rate
+    - k: Scaling factor
+    - capacity: Largest queue length kept
+    
+    Returns:
+    - Sparse (capacity+1, capacity+1) CSR generator Q with zero row sums;
+      p(t) = p(0) expm(Q t), e.g. via scipy.sparse.linalg.expm_multiply
+    """
+    lambda_new = k * lambda_val
+    mu_new = k * mu_val
+    up = np.full(capacity, lambda_new)
+    down = np.full(capacity, mu_new)
+    diag = np.zeros(capacity + 1)
+    diag[:-1] -= up
+    diag[1:] -= down
+    return sparse.diags([down, diag, up], [-1, 0, 1], format="csr")
+
+def transient_distribution(lambda_val, mu_val, times, k=1.0, initial=0,
+                           capacity=None, tol=1e-12, block=64):
+    """
+    Queue-length distribution P(N(t) = n) of an M/M/1 queue over time.
+    
+    Uses uniformization: with Lam = k*(lambda + mu) and P = I + Q/Lam,
+    p(t) = sum_m Poisson(m; Lam*t) p(0) P^m. The vectors p(0) P^m are
+    computed once and shared by every time point: they are collected in
+    blocks and added to all curves at once with a matrix product against
+    the Poisson weights. Starting from queue length n0, step m can only
+    reach lengths n0 - m .. n0 + m, so each step only updates that window.
+    
+    Parameters:
+    - lambda_val: Original arrival rate
+    - mu_val: Original service rate
+    - times: Time points (any order, all >= 0)
+    - k: Scaling factor
+    - initial: Initial queue length, or a distribution over 0..capacity
+    - capacity: Truncation bound (default: the largest length reachable
+      within the Poisson truncation, which makes the truncation exact
+      up to tol)
+    - tol: Poisson tail probability dropped at the largest time
+    - block: Number of vectors per matrix-product accumulation
+    
+    Returns:
+    - (len(times), capacity+1) array, row i is P(N(times[i]) = n)
+    """
+    times = np.asarray(times, dtype=float)
+    Lam = k * (lambda_val + mu_val)
+    num_terms = int(poisson.isf(tol, Lam * times.max())) + 1 if times.max() > 0 else 1
+
+    if np.ndim(initial) == 0:
+        lo, hi = int(initial), int(initial) + 1
+        if capacity is None:
+            capacity = lo + num_terms
+        p = np.zeros(capacity + 1)
+        p[lo] = 1.0
+    else:
+        p = np.array(initial, dtype=float)
+        support = np.flatnonzero(p)
+        lo, hi = int(support[0]), int(support[-1]) + 1
+        if capacity is None:
+            capacity = len(p) - 1
+        elif len(p) != capacity + 1:
+            raise ValueError("initial distribution must have capacity + 1 entries")
+    n_states = capacity + 1
+
+    # Poisson weights of every term for every time, from logs to avoid
+    # overflow of (Lam t)^m / m!
+    m = np.arange(num_terms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_w = -Lam * times[:, None] + m * np.log(Lam * times[:, None]) - gammaln(m + 1)
+    weights = np.exp(log_w)
+    weights[times == 0] = 0.0
+    weights[times == 0, 0] = 1.0
+
+    # Diagonals of P = I + Q/Lam
+    Q = mm1_generator(lambda_val, mu_val, k, capacity)
+    stay = 1.0 + Q.diagonal() / Lam
+    up = Q.diagonal(1) / Lam      # n -> n+1
+    down = Q.diagonal(-1) / Lam   # n+1 -> n
+
+    result = np.zeros((len(times), n_states))
+    buffer = np.zeros((block, n_states))
+    p_next = np.empty(n_states)
+    # p is zero outside p[lo:hi]
+    for start in range(0, num_terms, block):
+        stop = min(start + block, num_terms)
+        lo_block = max(0, lo - (stop - start))
+        hi_block = min(n_states, hi + stop - start)
+        for j in range(stop - start):
+            if start + j > 0:
+                # p <- p P restricted to the reachable window
+                lo, hi = max(0, lo - 1), min(n_states, hi + 1)
+                nxt = p_next[lo:hi]
+                np.multiply(p[lo:hi], stay[lo:hi], out=nxt)
+                nxt[1:] += p[lo:hi - 1] * up[lo:hi - 1]
+                nxt[:-1] += p[lo + 1:hi] * down[lo:hi - 1]
+                p[lo:hi] = nxt
+            buffer[j, lo_block:hi_block] = p[lo_block:hi_block]
+        count("uniformization_terms", stop - start)
+        result[:, lo_block:hi_block] += (weights[:, start:stop]
+                                         @ buffer[:stop - start, lo_block:hi_block])
+    return result
+
+def simulate_mm1(lambda_val, mu_val, k=1.0, num_jobs=1000000, seed=None,
+                 chunk_size=1000000, percentiles=(50, 90, 99)):
+    """
+    Simulate an M/M/1 queue with scaled rates using the Lindley recursion.
+    
+    Waiting times follow W_{n+1} = max(0, W_n + S_n - A_{n+1}). Writing
+    C_n for the running sum of S_{n-1} - A_n, this unrolls to
+    W_n = C_n + max(W_0, -min(C_0..C_n)), so each chunk of jobs is solved
+    with a cumulative sum and a running minimum instead of a Python loop.
+    
+    Parameters:
+    - lambda_val: Original arrival rate
+    - mu_val: Original service rate
+    - k: Scaling factor
+    - num_jobs: Number of jobs to simulate
+    - seed: Seed or numpy Generator for the random streams
+    - chunk_size: Jobs generated and solved per vectorized chunk
+    - percentiles: Percentiles of time in system to report
+    
+    Returns:
+    - Dict with "simulated" and "analytic" metric dicts, each holding
+      rho, throughput, E_N, E_T and the requested percentiles of T
+    """
+    lambda_new = k * lambda_val
+    mu_new = k * mu_val
+    rng = np.random.default_rng(seed)
+
+    sojourn = np.empty(num_jobs)
+    busy_time = 0.0
+    clock = 0.0          # arrival time of the last job so far
+    last_departure = 0.0
+    w_prev = 0.0         # waiting time of the previous job
+    s_prev = 0.0         # service time of the previous job (0 before job 0)
+
+    for start in range(0, num_jobs, chunk_size):
+        n = min(chunk_size, num_jobs - start)
+        A = rng.exponential(1 / lambda_new, n)  # interarrival times
+        S = rng.exponential(1 / mu_new, n)      # service times
+
+        # X_j = S_{j-1} - A_j, with the previous chunk's last job carried in
+        X = np.empty(n)
+        X[0] = s_prev - A[0]
+        X[1:] = S[:-1] - A[1:]
+        C = np.cumsum(X)
+        W = C + np.maximum(w_prev, -np.minimum.accumulate(C))
+
+        T = W + S
+        sojourn[start:start + n] = T
+        arrivals = clock + np.cumsum(A)
+        last_departure = max(last_departure, (arrivals + T).max())
+
+        busy_time += S.sum()
+        clock = arrivals[-1]
+        w_prev = W[-1]
+        s_prev = S[-1]
+
+    # Empirical metrics; E[N] follows from Little's law
+    throughput = num_jobs / clock
+    E_T = sojourn.mean()
+    simulated = {
+        "rho": busy_time / last_departure,
+        "throughput": throughput,
+        "E_N": throughput * E_T,
+        "E_T": E_T,
+    }
+    for p, value in zip(percentiles, np.percentile(sojourn, percentiles)):
+        simulated[f"T_p{p}"] = value
+
+    # Analytic metrics; time in system is exponential with rate mu - lambda
+    rho, throughput, E_N, E_T = calculate_mm1_metrics(lambda_val, mu_val, k)
+    analytic = {"rho": rho, "throughput": throughput, "E_N": E_N, "E_T": E_T}
+    for p in percentiles:
+        analytic[f"T_p{p}"] = -np.log(1 - p / 100) / (mu_new - lambda_new)
+
+    return {"simulated": simulated, "analytic": analytic}
+
+class RunningStats:
+    """
+    Online mean and variance accumulator (Welford's algorithm).
+    
+    Two accumulators can be merged without the underlying samples, so
+    worker processes only ever send back (n, mean, M2).
+    """
+
+    def __init__(self, n=0, mean=0.0, M2=0.0):
+        self.n = n
+        self.mean = mean
+        self.M2 = M2
+
+    def update(self, x):
+        """Add one sample."""
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.M2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        """Combine with another accumulator (Chan et al. parallel update)."""
+        n = self.n + other.n
+        if n == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.M2 += other.M2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    def state(self):
+        """Return (n, mean, M2) for sending between processes."""
+        return self.n, self.mean, self.M2
+
+    def variance(self):
+        """Sample variance of the accumulated values."""
+        return self.M2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    def confidence_interval(self, level=0.95):
+        """Student-t confidence interval (low, high) for the mean."""
+        if self.n < 2:
+            return float("nan"), float("nan")
+        half_width = (student_t.ppf(0.5 + level / 2, self.n - 1)
+                      * np.sqrt(self.variance() / self.n))
+        return self.mean - half_width, self.mean + half_width
+
+def _replication_task(task):
+    """
+    Run a batch of independent replications inside a worker process.
+    
+    Each replication has its own SeedSequence; only the accumulator
+    states are returned.
+    """
+    lambda_val, mu_val, k, rep_seqs, num_jobs = task
+    stats = {}
+    for rep_seq in rep_seqs:
+        result = simulate_mm1(lambda_val, mu_val, k, num_jobs,
+                              seed=np.random.default_rng(rep_seq))
+        for name, value in result["simulated"].items():
+            stats.setdefault(name, RunningStats()).update(value)
+    return k, {name: acc.state() for name, acc in stats.items()}
+
+def run_replications(lambda_val, mu_val, k_values, num_reps=32,
+                     num_jobs=100000, seed=0, processes=None, level=0.95):
+    """
+    Run independent M/M/1 replications per scaling factor in a process pool.
+    
+    A single seed is expanded with numpy's SeedSequence.spawn, so every
+    replication uses a statistically independent random stream and the
+    results do not depend on the number of processes.
+    
+    Parameters:
+    - lambda_val: Original arrival rate
+    - mu_val: Original service rate
+    - k_values: Scaling factors to simulate
+    - num_reps: Replications per scaling factor
+    - num_jobs: Jobs per replication
+    - seed: Root seed for all random streams
+    - processes: Number of worker processes (default: all cores)
+    - level: Confidence level of the reported intervals
+    
+    Returns:
+    - Dict mapping each k to {metric: {"mean", "ci_low", "ci_high", "n"}}
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    # Split each k's replications into roughly one task per worker
+    tasks_per_k = max(1, min(num_reps, processes))
+    root = np.random.SeedSequence(seed)
+    tasks = []
+    for k, k_seq in zip(k_values, root.spawn(len(k_values))):
+        rep_seqs = k_seq.spawn(num_reps)
+        for i in range(tasks_per_k):
+            tasks.append((lambda_val, mu_val, k, rep_seqs[i::tasks_per_k], num_jobs))
+
+    merged = {k: {} for k in k_values}
+
+    def merge_results(results):
+        for k, states in results:
+            for name, state in states.items():
+                merged[k].setdefault(name, RunningStats()).merge(RunningStats(*state))
+
+    if processes == 1:
+        merge_results(map(_replication_task, tasks))
+    else:
+        with Pool(processes) as pool:
+            merge_results(pool.imap_unordered(_replication_task, tasks))
+
+    report = {}
+    for k, stats in merged.items():
+        report[k] = {}
+        for name, acc in stats.items():
+            ci_low, ci_high = acc.confidence_interval(level)
+            report[k][name] = {"mean": acc.mean, "ci_low": ci_low,
+                               "ci_high": ci_high, "n": acc.n}
+    return report
+
 def main():
     """Main function to generate visualizations."""
+    import matplotlib.pyplot as plt  # only needed when plotting
     
     # Define original system parameters
     lambda_original = 2.0  # Original arrival rate (jobs/min)
@@ -64,19 +505,14 @@ def main():
     # Create range of scaling factors k
     k_values = np.linspace(0.5, 5, 100)
     
-    # Initialize arrays to store metrics
-    rho_values = []
-    throughput_values = []
-    E_N_values = []
-    E_T_values = []
-    
-    # Calculate metrics for each k value
-    for k in k_values:
-        rho, throughput, E_N, E_T = calculate_mm1_metrics(lambda_original, mu_original, k)
-        rho_values.append(rho)
-        throughput_values.append(throughput)
-        E_N_values.append(E_N)
-        E_T_values.append(E_T)
+    # Calculate metrics for every k value at once
+    with stage("metrics"):
+        metrics = evaluate_queue_grid(lambda_original, mu_original, k_values)
+        count("evaluations", len(k_values))
+    rho_values = metrics["rho"]
+    throughput_values = metrics["throughput"]
+    E_N_values = metrics["E_N"]
+    E_T_values = metrics["E_T"]
     
     # Create figure with 2x2 subplots
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
@@ -163,6 +599,20 @@ def main():
     print("\nLittle's Law Verification:")
     print(f"  At k=1: λ×E[T] = {lambda_original * E_T_values[50]:.4f} ≈ E[N] = {E_N_values[50]:.4f}")
     print(f"  At k=5: λ×E[T] = {throughput_values[-1] * E_T_values[-1]:.4f} ≈ E[N] = {E_N_values[-1]:.4f}")
+    print("\nSimulation Check (10^6 jobs, simulated vs analytic):")
+    for k in (1, 5):
+        with stage("simulation_check"):
+            check = simulate_mm1(lambda_original, mu_original, k, seed=k)
+            count("jobs", 1000000)
+        for name in ("rho", "throughput", "E_N", "E_T", "T_p99"):
+            print(f"  k={k} {name:>10}: {check['simulated'][name]:.4f} vs {check['analytic'][name]:.4f}")
+    print("\nDraining a Burst of 50 Jobs (transient E[N(t)], uniformization):")
+    drain_times = np.array([0.5, 1, 2, 5, 10, 20])
+    for k in (1, 5):
+        with stage("transient"):
+            P = transient_distribution(lambda_original, mu_original, drain_times, k=k, initial=50)
+        E_N_t = P @ np.arange(P.shape[1])
+        print(f"  k={k}: " + ", ".join(f"t={t:g}: {e:.2f}" for t, e in zip(drain_times, E_N_t)))
     print("=" * 60)
     
     plt.show()
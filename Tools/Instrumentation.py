@@ -0,0 +1,169 @@
+"""
+Opt-in per-stage timing and counters for the project scripts.
+
+Authors: Mason Lohnes, Reece Gerhart
+Course: CST-305 - Principles of Modeling and Simulation
+
+Description:
+Scripts wrap their phases (integration, interpolation, plotting, ...) in
+`with stage("name"):` blocks and report work with `count("rhs_evals", n)`.
+When instrumentation is enabled each stage records its wall time, its
+counters, the bytes it left allocated and its peak traced memory above
+the level it started at. The records are written as JSON when the
+program exits.
+
+Instrumentation is enabled by setting the environment variable
+CST305_INSTRUMENT to an output path (or "-" for stderr), or by calling
+enable(). When disabled, stage() returns one shared no-op context manager
+and count() returns immediately, so the hooks cost almost nothing.
+
+The scripts only carry no-op stage/count hooks and never import this
+module themselves; ProjectModules.load_project replaces the hooks through
+attach(). To record a script's own command line, start it through
+Tools/ProjectModules.py.
+
+Usage:
+    CST305_INSTRUMENT=stages.json python3 Tools/ProjectModules.py Project2/solution.py
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+_enabled = False
+_output = None
+_records = []
+_stack = []
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    """Context manager that records one stage while instrumentation is on."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = {}
+        self.peak = 0
+
+    def __enter__(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            # The enclosing stage keeps the peak reached before this one
+            parent = _stack[-1]
+            parent.peak = max(parent.peak, peak)
+        tracemalloc.reset_peak()
+        self.path = "/".join([s.name for s in _stack] + [self.name])
+        self.start_bytes = current
+        _stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        _stack.pop()
+        if _stack:
+            _stack[-1].peak = max(_stack[-1].peak, self.peak)
+        _records.append({
+            "stage": self.path,
+            "wall_seconds": wall,
+            "counters": self.counters,
+            "allocated_bytes": current - self.start_bytes,
+            "peak_bytes": self.peak - self.start_bytes,
+        })
+        return False
+
+
+def stage(name):
+    """
+    Context manager timing one stage of a script.
+
+    Parameters:
+    - name: Stage name; nested stages are reported as "outer/inner"
+
+    Returns:
+    - A recording context manager, or a shared no-op one when disabled
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def count(name, n=1):
+    """
+    Add n to a counter (e.g. "rhs_evals", "steps") of the innermost stage.
+
+    Parameters:
+    - name: Counter name
+    - n: Amount to add
+    """
+    if not _enabled or not _stack:
+        return
+    counters = _stack[-1].counters
+    counters[name] = counters.get(name, 0) + n
+
+
+def attach(module):
+    """
+    Replace a project script's no-op stage/count hooks with these ones.
+
+    Parameters:
+    - module: Loaded script module (see ProjectModules.load_project)
+    """
+    module.stage = stage
+    module.count = count
+
+
+def enable(output=None):
+    """
+    Turn instrumentation on.
+
+    Parameters:
+    - output: JSON file written at exit, "-" for stderr, or None to only
+      collect records (see report())
+    """
+    global _enabled, _output
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+    _output = output
+
+
+def disable():
+    """Turn instrumentation off; records collected so far are kept."""
+    global _enabled
+    _enabled = False
+
+
+def report():
+    """Return the list of stage records collected so far."""
+    return list(_records)
+
+
+def write_report(output=None):
+    """
+    Write the collected stage records as JSON.
+
+    Parameters:
+    - output: File path or "-" for stderr (default: the enable() output)
+    """
+    output = output or _output
+    if output is None:
+        return
+    data = {"script": os.path.basename(sys.argv[0]), "stages": report()}
+    if output == "-":
+        json.dump(data, sys.stderr, indent=2)
+        sys.stderr.write("\n")
+    else:
+        with open(output, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+if os.environ.get("CST305_INSTRUMENT"):
+    enable(os.environ["CST305_INSTRUMENT"])
+    atexit.register(write_report)
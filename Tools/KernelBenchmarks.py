@@ -0,0 +1,255 @@
+"""
+Headless benchmark suite for the numerical kernels of every project.
+
+Authors: Mason Lohnes, Reece Gerhart
+Course: CST-305 - Principles of Modeling and Simulation
+
+Description:
+Times each kernel (RK4, the Lorenz Euler and Rosenbrock loops, the power
+series, the CPU utilization ODE and the M/M/1 metrics) across a range of
+problem sizes and records the run time, throughput and peak traced memory
+to a JSON file. A stored baseline can be compared against to flag
+regressions. Nothing is plotted, so the suite runs on machines without a
+display.
+
+Packages Used:
+- numpy, scipy: Required by the kernels being measured
+
+Approach:
+1. Build each kernel at each problem size
+2. Time the best of several repeats (after one warm-up call)
+3. Measure peak memory in a separate run with tracemalloc
+4. Write the results as JSON and compare them against a baseline
+
+Usage:
+    python3 Tools/KernelBenchmarks.py --output results.json
+    python3 Tools/KernelBenchmarks.py --baseline baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+from scipy.integrate import odeint
+
+from ProjectModules import load_project
+
+
+# ============================
+# Kernels
+# ============================
+# Each builder takes a problem size and returns (callable, work units)
+
+def _rk4_loop(runs):
+    m = load_project("rk_solution")
+    return (lambda: m.solve_RK(1.0, 1.0, 0.001, runs, verbose=False)), runs
+
+def _rk4_batch(n):
+    m = load_project("rk_solution")
+    x0 = np.linspace(0.5, 2.0, n)
+    runs = 100
+    return (lambda: m.RK_batch(x0, 1.0, 0.01, runs)), n * runs
+
+def _lorenz_euler(num_steps):
+    m = load_project("lorenz_workloads")
+    return (lambda: m.simulate(28.0, 0.01, num_steps)), num_steps
+
+def _lorenz_ensemble(members):
+    m = load_project("lorenz_workloads")
+    r = np.linspace(1, 50, members)
+    num_steps = 1000
+    return (lambda: m.simulate_ensemble(r, (0., 1., 1.05), num_steps=num_steps)), members * num_steps
+
+def _lorenz_rosenbrock(members):
+    m = load_project("lorenz_workloads")
+    r = np.linspace(500, 1500, members)  # Euler with dt=0.01 diverges here
+    t_eval = np.arange(1001) * 0.01
+
+    def run():
+        for _ in m.iter_implicit_samples(r, (0., 1., 1.05), t_eval):
+            pass
+    return run, members * len(t_eval)
+
+def _series_coeffs(order):
+    m = load_project("taylor_polynomials")
+
+    def run():
+        m._coeff_cache.clear()  # measure the recurrence, not the cache
+        m.series_coeffs(N=order)
+    return run, order
+
+def _series_solution(points):
+    m = load_project("taylor_polynomials")
+    coeffs = m.series_coeffs(N=64)
+    x = np.linspace(-1.5, 1.5, points)
+    return (lambda: m.series_solution(coeffs, x)), points * len(coeffs)
+
+def _cpu_util_odeint(points):
+    m = load_project("cpu_workloads")
+    t = np.linspace(0, 10, points)
+    return (lambda: odeint(m.cpu_util, 0.2, t, args=(2.0, 1.0))), points
+
+def _cpu_util_fleet(machines):
+    m = load_project("cpu_workloads")
+    lam = np.linspace(0.5, 5.0, machines)
+    t = np.linspace(0, 10, 100)
+    return (lambda: m.solve_cpu_util(lam, 1.0, 0.2, t)), machines * len(t)
+
+def _mm1_metrics_loop(calls):
+    m = load_project("mm1_scaling")
+    k_values = np.linspace(0.5, 5, calls)
+    return (lambda: [m.calculate_mm1_metrics(2.0, 5.0, k) for k in k_values]), calls
+
+def _mm1_metrics_grid(points):
+    m = load_project("mm1_scaling")
+    k_values = np.linspace(0.5, 5, points)
+    return (lambda: m.calculate_mm1_metrics(2.0, 5.0, k_values)), points
+
+# name -> (work unit, problem sizes, builder)
+BENCHMARKS = {
+    "rk4_loop": ("steps", (1000, 10000), _rk4_loop),
+    "rk4_batch": ("problem-steps", (1000, 10000), _rk4_batch),
+    "lorenz_euler": ("steps", (1000, 10000), _lorenz_euler),
+    "lorenz_ensemble": ("member-steps", (10, 100, 1000), _lorenz_ensemble),
+    "lorenz_rosenbrock": ("member-samples", (1, 64), _lorenz_rosenbrock),
+    "series_coeffs": ("coefficients", (8, 64, 512), _series_coeffs),
+    "series_solution": ("point-terms", (1000, 100000, 1000000), _series_solution),
+    "cpu_util_odeint": ("grid-points", (1000, 10000, 100000), _cpu_util_odeint),
+    "cpu_util_fleet": ("machine-points", (1000, 100000), _cpu_util_fleet),
+    "mm1_metrics_loop": ("evaluations", (100, 10000), _mm1_metrics_loop),
+    "mm1_metrics_grid": ("evaluations", (100, 10000, 1000000), _mm1_metrics_grid),
+}
+
+
+# ============================
+# Measurement
+# ============================
+def measure(fn, repeat=3):
+    """
+    Time a kernel and measure its peak memory.
+
+    Parameters:
+    - fn: Zero-argument callable running the kernel once
+    - repeat: Number of timed runs; the fastest is reported
+
+    Returns:
+    - seconds: Best wall time of one run
+    - peak_bytes: Peak memory traced by tracemalloc during one run
+    """
+    fn()  # warm-up (imports, caches, page faults)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    # tracemalloc slows allocation down, so it gets its own run
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak_bytes
+
+def run_benchmarks(names=None, quick=False, repeat=3):
+    """
+    Run the selected benchmarks across their problem sizes.
+
+    Parameters:
+    - names: Benchmark names to run (default: all)
+    - quick: Only run the smallest problem size of each benchmark
+    - repeat: Timed runs per measurement
+
+    Returns:
+    - List of result dicts (kernel, size, unit, seconds, throughput, peak_bytes)
+    """
+    results = []
+    for name in names or BENCHMARKS:
+        unit, sizes, builder = BENCHMARKS[name]
+        for size in sizes[:1] if quick else sizes:
+            fn, work = builder(size)
+            seconds, peak_bytes = measure(fn, repeat)
+            results.append({
+                "kernel": name,
+                "size": size,
+                "unit": unit,
+                "seconds": seconds,
+                "throughput": work / seconds if seconds > 0 else float("inf"),
+                "peak_bytes": peak_bytes,
+            })
+            print(f"{name:>18} size={size:<8} {seconds*1e3:10.3f} ms "
+                  f"{results[-1]['throughput']:12.4g} {unit}/s "
+                  f"{peak_bytes/1024:10.1f} KiB")
+    return results
+
+def compare_to_baseline(results, baseline, threshold=0.25):
+    """
+    Find kernels that got slower than the baseline.
+
+    Parameters:
+    - results: Result dicts from run_benchmarks
+    - baseline: Result dicts from an earlier run
+    - threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+    - List of (kernel, size, baseline seconds, new seconds) regressions
+    """
+    previous = {(r["kernel"], r["size"]): r["seconds"] for r in baseline}
+    regressions = []
+    for r in results:
+        key = (r["kernel"], r["size"])
+        if key in previous and r["seconds"] > previous[key] * (1 + threshold):
+            regressions.append((r["kernel"], r["size"], previous[key], r["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument("--quick", action="store_true",
+                        help="only run the smallest size of each benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.quick, args.repeat)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions (slower by more than {args.threshold:.0%}):")
+            for kernel, size, old, new in regressions:
+                print(f"  {kernel} size={size}: {old*1e3:.3f} ms -> {new*1e3:.3f} ms")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Long-lived query server for queue and CPU utilization metrics.
+
+Authors: Mason Lohnes, Reece Gerhart
+Course: CST-305 - Principles of Modeling and Simulation
+
+Description:
+Dashboards that spawn a Python script per query pay the full import cost
+every time. This server imports the project code once and answers
+newline-delimited JSON queries on a Unix domain socket. Queries that
+arrive together (from one or many clients) are coalesced into a single
+vectorized call of evaluate_queue_grid or cpu_util_steady_state, and
+recent results are kept in a small LRU cache. Everything runs locally.
+
+Packages Used:
+- numpy, scipy: Required by the project code being served
+
+Protocol (one JSON object per line, answered by one JSON line):
+    {"id": 1, "op": "mm1", "lambda": 2, "mu": 5, "k": 1}
+        -> {"id": 1, "rho": 0.4, "throughput": 2.0, "E_N": 0.667, ...}
+       an integer "c" (M/M/c, 1 <= c <= 1000) or "K" (M/M/1/K,
+       0 <= K <= 10^6) may be added; k defaults to 1
+    {"id": 2, "op": "cpu_util", "lambda": 2, "mu": 1}
+        -> {"id": 2, "u_ss": 0.667}
+    {"id": 3, "op": "stats"}
+        -> request, cache and batch counters plus latency percentiles
+Answers carry the query's "id" and may arrive out of order. Undefined
+metrics (unstable queues) are null; bad queries get {"id", "error"}.
+
+Usage:
+    python3 Tools/MetricsServer.py --socket /tmp/cst305-metrics.sock
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from ProjectModules import load_project
+
+DEFAULT_SOCKET = "/tmp/cst305-metrics.sock"
+
+# Largest accepted server count and capacity. erlang_c runs a Python loop
+# over 1..c on the event loop, so c must stay small enough not to stall it.
+MAX_SERVERS = 1000
+MAX_CAPACITY = 10**6
+
+
+# ============================
+# Batched evaluation
+# ============================
+def _json_number(value):
+    """Convert a NumPy scalar to a JSON-safe float (None for NaN/inf)."""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+def _integer(query, name):
+    """Read an integer field, rejecting booleans and fractional numbers."""
+    value = query[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) \
+            or isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{name} must be an integer")
+    return int(value)
+
+def _query_key(query):
+    """
+    Validate a query and reduce it to a hashable key.
+
+    Parameters:
+    - query: Decoded JSON object
+
+    Returns:
+    - (group, params): group selects the vectorized call, params are the
+      numeric inputs in a fixed order
+    """
+    op = query.get("op")
+    if op not in ("cpu_util", "mm1"):
+        raise ValueError(f"unknown op {op!r}")
+    if op == "mm1" and "c" in query and "K" in query:
+        raise ValueError("give at most one of c and K")
+    try:
+        if op == "cpu_util":
+            return ("cpu_util",), (float(query["lambda"]), float(query["mu"]))
+        params = (float(query["lambda"]), float(query["mu"]), float(query.get("k", 1.0)))
+    except KeyError as exc:
+        raise ValueError(f"missing field {exc.args[0]!r}") from None
+    except (TypeError, ValueError):
+        raise ValueError("parameters must be numbers") from None
+
+    if "c" in query:
+        size = _integer(query, "c")
+        if not 1 <= size <= MAX_SERVERS:
+            raise ValueError(f"c must be between 1 and {MAX_SERVERS}")
+        return ("mm1", "c"), params + (size,)
+    if "K" in query:
+        size = _integer(query, "K")
+        if not 0 <= size <= MAX_CAPACITY:
+            raise ValueError(f"K must be between 0 and {MAX_CAPACITY}")
+        return ("mm1", "K"), params + (size,)
+    return ("mm1",), params
+
+def evaluate_batch(group, params):
+    """
+    Evaluate many queries of one group with a single vectorized call.
+
+    Parameters:
+    - group: Group from _query_key
+    - params: List of parameter tuples of that group
+
+    Returns:
+    - List of result dicts, one per parameter tuple
+    """
+    columns = np.array(params, dtype=float).T
+    if group == ("cpu_util",):
+        u_ss = load_project("cpu_workloads").cpu_util_steady_state(columns[0], columns[1])
+        return [{"u_ss": _json_number(u)} for u in u_ss]
+
+    extra = {}
+    if len(group) == 2:
+        extra[group[1]] = columns[3].astype(int)
+    metrics = load_project("mm1_scaling").evaluate_queue_grid(
+        columns[0], columns[1], columns[2], **extra)
+    names = [name for name in metrics if name != "stable"]
+    return [dict({name: _json_number(metrics[name][i]) for name in names},
+                 stable=bool(metrics["stable"][i]))
+            for i in range(len(params))]
+
+
+# ============================
+# Server
+# ============================
+class MetricsServer:
+    """Coalescing, caching query server; see the module docstring."""
+
+    def __init__(self, cache_size=4096, max_batch=4096, latency_window=10000):
+        self.cache_size = cache_size
+        self.max_batch = max_batch
+        self.cache = OrderedDict()
+        self.pending = {}          # group -> list of (params, future)
+        self.flush_scheduled = False
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "errors": 0, "cache_hits": 0,
+                         "batches": 0, "evaluated": 0, "connections": 0}
+
+    # --- Evaluation ---
+    async def evaluate(self, query):
+        """Answer one metrics query from the cache or the next batch."""
+        group, params = _query_key(query)
+        key = (group, params)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return self.cache[key]
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self.pending.setdefault(group, [])
+        batch.append((params, future))
+        if len(batch) >= self.max_batch:
+            self._flush_group(group)
+        elif not self.flush_scheduled:
+            # Let every query that is already readable join the batch
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        self.flush_scheduled = False
+        for group in list(self.pending):
+            self._flush_group(group)
+
+    def _flush_group(self, group):
+        batch = self.pending.pop(group, [])
+        if not batch:
+            return
+        # Identical queries in one batch are evaluated once
+        unique = list(dict.fromkeys(params for params, _ in batch))
+        try:
+            results = dict(zip(unique, evaluate_batch(group, unique)))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.counters["batches"] += 1
+        self.counters["evaluated"] += len(unique)
+        for params, result in results.items():
+            self.cache[(group, params)] = result
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        for params, future in batch:
+            if not future.done():
+                future.set_result(results[params])
+
+    # --- Statistics ---
+    def stats(self):
+        """Counters, throughput and latency percentiles since start-up."""
+        uptime = time.perf_counter() - self.started
+        stats = dict(self.counters)
+        stats["uptime_seconds"] = uptime
+        stats["requests_per_second"] = self.counters["requests"] / uptime if uptime > 0 else 0.0
+        stats["mean_batch_size"] = (self.counters["evaluated"] / self.counters["batches"]
+                                    if self.counters["batches"] else 0.0)
+        stats["cache_entries"] = len(self.cache)
+        if self.latencies:
+            p50, p90, p99 = np.percentile(self.latencies, (50, 90, 99)) * 1e6
+            stats.update(latency_us_p50=p50, latency_us_p90=p90, latency_us_p99=p99,
+                         latency_us_max=max(self.latencies) * 1e6)
+        return stats
+
+    # --- Connections ---
+    async def _answer(self, line, writer):
+        start = time.perf_counter()
+        query_id = None
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError("query must be a JSON object")
+            query_id = query.get("id")
+            if query.get("op") == "stats":
+                response = self.stats()
+            else:
+                self.counters["requests"] += 1
+                response = dict(await self.evaluate(query))
+        except Exception as exc:  # report to the client, keep serving
+            self.counters["errors"] += 1
+            response = {"error": str(exc)}
+        response["id"] = query_id
+        writer.write(json.dumps(response).encode() + b"\n")
+        if "error" not in response:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def handle(self, reader, writer):
+        """Serve one client connection until it closes."""
+        self.counters["connections"] += 1
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Pipelined queries are answered concurrently so they batch
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if writer.transport.get_write_buffer_size() > 1 << 20:
+                    await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(path=DEFAULT_SOCKET, cache_size=4096, max_batch=4096):
+    """
+    Run the server on a Unix domain socket until cancelled or SIGTERM.
+
+    Parameters:
+    - path: Socket path (a stale socket file is replaced)
+    - cache_size: Number of results kept in the LRU cache
+    - max_batch: Queries per vectorized call before flushing early
+    """
+    # Import the project code before the first query arrives
+    load_project("mm1_scaling")
+    load_project("cpu_workloads")
+
+    server_state = MetricsServer(cache_size, max_batch)
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(server_state.handle, path=path)
+    print(f"Serving metrics on {path}", flush=True)
+    # SIGTERM stops the server like Ctrl-C, so the socket file is removed
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# ============================
+# Client
+# ============================
+def query(queries, path=DEFAULT_SOCKET):
+    """
+    Send queries to a running server and wait for every answer.
+
+    Parameters:
+    - queries: List of query dicts; "id" is filled in where missing
+    - path: Socket path of the server
+
+    Returns:
+    - List of response dicts in the order of the queries
+    """
+    queries = [dict(q, id=q.get("id", i)) for i, q in enumerate(queries)]
+    payload = b"".join(json.dumps(q).encode() + b"\n" for q in queries)
+    responses = {}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            for line in f:
+                response = json.loads(line)
+                responses[response["id"]] = response
+    return [responses[q["id"]] for q in queries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--cache-size", type=int, default=4096,
+                        help="results kept in the LRU cache")
+    parser.add_argument("--max-batch", type=int, default=4096,
+                        help="queries per vectorized evaluation")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.socket, args.cache_size, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
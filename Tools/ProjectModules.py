@@ -0,0 +1,97 @@
+"""
+Load the project scripts as modules.
+
+Each project folder holds standalone scripts (two of them are called
+CPUWorkloads.py), so they cannot be imported as packages. This loads a
+script from its path under a unique module name and registers it in
+sys.modules, so process pools can pickle its functions. The script's
+stage/count hooks are connected to Instrumentation.py.
+
+Authors: Mason Lohnes, Reece Gerhart
+Course: CST-305 - Principles of Modeling and Simulation
+
+Usage (run a script's command line with its stages recorded):
+    CST305_INSTRUMENT=stages.json python3 Tools/ProjectModules.py Project2/solution.py [args]
+"""
+
+import ast
+import importlib.util
+import os
+import sys
+
+import Instrumentation
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module name -> script path relative to the repository root
+PROJECT_FILES = {
+    "cpu_workloads": os.path.join("Project1", "CPUWorkloads.py"),
+    "rk_solution": os.path.join("Project2", "solution.py"),
+    "greens_functions": os.path.join("Project3", "GreensFunctions.py"),
+    "lorenz_workloads": os.path.join("Project5", "CPUWorkloads.py"),
+    "taylor_polynomials": os.path.join("Project6", "TaylorPolynomials.py"),
+    "butterfly_workloads": os.path.join("Project7", "CPUWorkloads.py"),
+    "mm1_scaling": os.path.join("Project7", "MM1Scaling.py"),
+}
+
+
+def load_project(name):
+    """
+    Import a project script by its name in PROJECT_FILES.
+    
+    Parameters:
+    - name: Key of PROJECT_FILES, e.g. "mm1_scaling"
+    
+    Returns:
+    - The loaded module (cached in sys.modules after the first call)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(REPO_ROOT, PROJECT_FILES[name])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    Instrumentation.attach(module)
+    return module
+
+
+def run_project(name, args=()):
+    """
+    Run a project script's `if __name__ == "__main__":` block.
+
+    The script is loaded with load_project, so its stage/count hooks are
+    attached, and the body of its __main__ block is then executed in the
+    module with sys.argv set as if the script had been started directly.
+
+    Parameters:
+    - name: Key of PROJECT_FILES or a script path listed in it
+    - args: Command-line arguments for the script
+    """
+    paths = {os.path.normcase(os.path.join(REPO_ROOT, path)): key
+             for key, path in PROJECT_FILES.items()}
+    name = paths.get(os.path.normcase(os.path.abspath(name)), name)
+    if name not in PROJECT_FILES:
+        raise ValueError(f"unknown project script {name!r}")
+    module = load_project(name)
+    with open(module.__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), module.__file__)
+    main_blocks = [node for node in tree.body if isinstance(node, ast.If)
+                   and ast.unparse(node.test) == "__name__ == '__main__'"]
+    sys.argv = [module.__file__] + list(args)
+    for block in main_blocks:
+        code = compile(ast.Module(body=block.body, type_ignores=[]), module.__file__, "exec")
+        exec(code, vars(module))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python3 Tools/ProjectModules.py <script or name> [args]")
+    try:
+        run_project(sys.argv[1], sys.argv[2:])
+    except ValueError as exc:
+        sys.exit(f"error: {exc}")